@@ -1,32 +1,357 @@
 import os
 import sys
+import stat
 import subprocess
 import platform
 import hashlib
 import json
+import atexit
+import asyncio
 import time
 import glob
-import zipfile
+import shlex
+import shutil
+import locale
+import mmap
+import select
+import tempfile
+import py_compile
+import uuid
+import functools
+import importlib.util
+import io
+import contextlib
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Union, Callable
-from contextlib import contextmanager
 from datetime import datetime
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                wait, FIRST_COMPLETED, BrokenExecutor)
+import multiprocessing
 import threading
 
+# pybind11 e maturin servono solo ai sottoprocessi (include, "python -m maturin"):
+# basta sapere se sono installati, senza importarli qui e in ogni worker
+PYBIND11_AVAILABLE = importlib.util.find_spec("pybind11") is not None
+
+# NUOVO: Controllo per Maturin (il build tool di PyO3)
+MATURIN_AVAILABLE = importlib.util.find_spec("maturin") is not None
+
+# Serializzazione veloce (opzionale) dell'indice cache
 try:
-    import pybind11
-    PYBIND11_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    PYBIND11_AVAILABLE = False
+    ORJSON_AVAILABLE = False
 
-# NUOVO: Controllo per Maturin (il build tool di PyO3)
+# Hash dei sorgenti più veloce (opzionale): l'indice registra l'algoritmo usato
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# xxHash3 (opzionale), il più veloce: non crittografico, ma basta per decidere se ricompilare
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+_FILE_HASH_ALGO = ("xxh3_128" if XXHASH_AVAILABLE else
+                   "blake3" if BLAKE3_AVAILABLE else "sha256")
+
+# Lock advisory dell'indice cache: flock su POSIX, msvcrt.locking su Windows
 try:
-    import maturin
-    MATURIN_AVAILABLE = True
+    import fcntl
 except ImportError:
-    MATURIN_AVAILABLE = False
+    fcntl = None
+    import msvcrt
+
+
+@contextlib.contextmanager
+def _file_lock(lock_path: Path, exclusive: bool = True):
+    """
+    Lock advisory tra processi su lock_path (creato se manca). Condiviso
+    (exclusive=False) solo dove c'è flock: msvcrt.locking è sempre esclusivo.
+    """
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@functools.lru_cache(maxsize=1)
+def _find_vcvars64_cached() -> str:
+    """
+    Cerca vcvars64.bat: prima da %VSINSTALLDIR% (prompt di VS già attivo) o da
+    vswhere.exe, poi tra le installazioni note di Visual Studio.
+    """
+    install_dirs = []
+    if os.environ.get("VSINSTALLDIR"):
+        install_dirs.append(os.environ["VSINSTALLDIR"])
+    vswhere = (Path(os.environ.get("ProgramFiles(x86)", "C:/Program Files (x86)"))
+               / "Microsoft Visual Studio/Installer/vswhere.exe")
+    if vswhere.exists():
+        try:
+            result = subprocess.run([str(vswhere), "-latest", "-products", "*",
+                                     "-property", "installationPath"],
+                                    capture_output=True, text=True, timeout=30)
+            install_dirs.extend(result.stdout.splitlines())
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    for install_dir in install_dirs:
+        candidate = Path(install_dir.strip()) / "VC/Auxiliary/Build/vcvars64.bat"
+        if install_dir.strip() and candidate.exists():
+            return str(candidate)
+
+    base_paths = [
+        Path("C:/Program Files/Microsoft Visual Studio"),
+        Path("C:/Program Files (x86)/Microsoft Visual Studio")
+    ]
+    versions = ["2022", "2019", "2017"]
+    editions = ["BuildTools", "Community", "Professional", "Enterprise"]
+
+    for base in base_paths:
+        for version in versions:
+            for edition in editions:
+                candidate = base / version / edition / "VC/Auxiliary/Build/vcvars64.bat"
+                if candidate.exists():
+                    return str(candidate)
+
+    raise FileNotFoundError(
+        "vcvars64.bat non trovato! Installa Visual Studio Build Tools o Community."
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _capture_msvc_env(vcvars_path: str) -> Dict[str, str]:
+    """Esegue vcvars64.bat una volta e restituisce l'ambiente risultante ('set')."""
+    result = subprocess.run(f'call "{vcvars_path}" >nul && set', shell=True,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OSError(f"Esecuzione di vcvars64.bat fallita: {result.stderr.strip()}")
+
+    env = {}
+    for line in result.stdout.splitlines():
+        key, sep, value = line.partition("=")
+        if sep and key:
+            env[key] = value
+    return env
+
+
+@functools.lru_cache(maxsize=4096)
+def _resolve_cached(path_str: str, cwd: str) -> Path:
+    """Path.resolve() memoizzato (percorsi relativi legati alla cwd del momento)."""
+    return Path(cwd, path_str).resolve(strict=False)
+
+
+def _resolve_path(path: Union[str, Path]) -> Path:
+    """
+    Percorso assoluto e canonico di un sorgente, senza rifare la risoluzione
+    (e le sue syscall) per ogni build dello stesso file.
+    """
+    path_str = os.fspath(path)
+    return _resolve_cached(path_str, "" if os.path.isabs(path_str) else os.getcwd())
+
+
+def _resolve_paths(paths: List[Union[str, Path]]) -> List[Path]:
+    """
+    Come _resolve_path per più file: la directory comune si risolve una volta
+    sola e i singoli file le vengono accodati, invece di rifare la realpath
+    (uno stat per componente) dell'intero percorso di ciascuno.
+    La scorciatoia vale solo se nessun percorso contiene '..' (abspath lo
+    toglierebbe senza seguire i symlink) e se sotto la radice comune non ci
+    sono symlink; altrimenti ogni percorso passa da _resolve_path.
+    """
+    path_strs = [os.fspath(p) for p in paths]
+    if len(path_strs) < 2 or any(os.pardir in Path(p).parts for p in path_strs):
+        return [_resolve_path(p) for p in path_strs]
+    abs_paths = [os.path.abspath(p) for p in path_strs]
+    try:
+        common = os.path.commonpath(abs_paths)
+    except ValueError:
+        # Unità diverse su Windows: nessuna radice comune
+        return [_resolve_path(p) for p in path_strs]
+    relative = [os.path.relpath(p, common) for p in abs_paths]
+    for rel in relative:
+        current = common
+        for part in Path(rel).parts:
+            current = os.path.join(current, part)
+            if os.path.islink(current):
+                return [_resolve_path(p) for p in path_strs]
+    root = _resolve_path(common)
+    return [root / rel for rel in relative]
+
+
+@functools.lru_cache(maxsize=4096)
+def _cache_key_cached(path_strs: Tuple[str, ...], artifact_name: str, cwd: str) -> str:
+    """Corpo di UniversalBuilder._cache_key (cwd conta solo per i percorsi relativi)."""
+    joined = b"\0".join(sorted(str(_resolve_cached(p, "" if os.path.isabs(p) else cwd)).encode()
+                               for p in path_strs))
+    return f"{artifact_name}::{hashlib.blake2b(joined, digest_size=16).hexdigest()}"
+
+
+# Script eseguito UNA volta per interprete: include di Python, EXT_SUFFIX,
+# include di PyBind11 (come `python -m pybind11 --includes`, uno per riga) e
+# cache_tag del bytecode, separati da NUL. Un solo processo al posto di quattro.
+_PYTHON_CONFIG_SCRIPT = (
+    "import sys, sysconfig\n"
+    "include = sysconfig.get_path('include')\n"
+    "ext_suffix = sysconfig.get_config_var('EXT_SUFFIX') or ''\n"
+    "try:\n"
+    "    import pybind11\n"
+    "    dirs = []\n"
+    "    for d in (include, sysconfig.get_path('platinclude'), pybind11.get_include()):\n"
+    "        if d not in dirs:\n"
+    "            dirs.append(d)\n"
+    "    pybind_includes = '\\n'.join('-I' + d for d in dirs)\n"
+    "except ImportError:\n"
+    "    pybind_includes = ''\n"
+    "cache_tag = sys.implementation.cache_tag or ''\n"
+    "print('\\0'.join([include, ext_suffix, pybind_includes, cache_tag]), end='')\n"
+)
+
+
+# Esegue il bytecode precompilato di uno script come __main__ (argv: pyc, script
+# con percorso assoluto). Come 'python script.py': __main__ vero (sys.modules),
+# __file__ e sys.argv[0] assoluti, sys.path[0] = directory dello script e
+# traceback senza il frame <string> di questo runner.
+_PYC_RUNNER = (
+    "import marshal, os, sys, types\n"
+    "pyc, script = sys.argv[1:3]\n"
+    "sys.argv = [script]\n"
+    "sys.path[0] = os.path.dirname(script)\n"
+    "main = types.ModuleType('__main__')\n"
+    "main.__file__ = script\n"
+    "sys.modules['__main__'] = main\n"
+    "with open(pyc, 'rb') as f:\n"
+    "    code = marshal.loads(f.read()[16:])\n"
+    "del marshal, os, types, pyc, script, f\n"
+    "try:\n"
+    "    exec(code, main.__dict__)\n"
+    "except SystemExit:\n"
+    "    raise\n"
+    "except BaseException as e:\n"
+    "    e = e.with_traceback(e.__traceback__.tb_next)\n"
+    "    sys.excepthook(type(e), e, e.__traceback__)\n"
+    "    sys.exit(1)\n"
+)
+
+
+# Interprete persistente di build_and_run_python (reuse_interpreter=True).
+# Protocollo: una richiesta JSON per riga su stdin, il codice di uscita dello
+# script come risposta su stdout. Ogni script gira in un figlio (fork) con
+# stdout/stderr rediretti sui file indicati nella richiesta.
+_PY_WORKER_BOOTSTRAP = (
+    "import json, os, sys, runpy, traceback\n"
+    "for line in sys.stdin:\n"
+    "    req = json.loads(line)\n"
+    "    pid = os.fork()\n"
+    "    if pid == 0:\n"
+    "        code = 1\n"
+    "        try:\n"
+    "            os.chdir(req['cwd'])\n"
+    "            for fd, key in ((1, 'out'), (2, 'err')):\n"
+    "                f = os.open(req[key], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)\n"
+    "                os.dup2(f, fd)\n"
+    "                os.close(f)\n"
+    "            # Anche l'fd 0 (la pipe delle richieste) va su devnull: i sottoprocessi\n"
+    "            # dello script non devono leggere le righe del protocollo\n"
+    "            f = os.open(os.devnull, os.O_RDONLY)\n"
+    "            os.dup2(f, 0)\n"
+    "            os.close(f)\n"
+    "            sys.stdin = open(0, closefd=False)\n"
+    "            sys.argv = [req['argv0']]\n"
+    "            sys.path[0] = os.path.dirname(req['script'])\n"
+    "            runpy.run_path(req['argv0'], run_name='__main__')\n"
+    "            code = 0\n"
+    "        except SystemExit as e:\n"
+    "            if e.code is None or isinstance(e.code, int):\n"
+    "                code = e.code or 0\n"
+    "            else:\n"
+    "                print(e.code, file=sys.stderr)\n"
+    "        except BaseException as e:\n"
+    "            # Traceback dallo script in giù, senza i frame di runpy\n"
+    "            tb = e.__traceback__\n"
+    "            while tb is not None and tb.tb_frame.f_code.co_filename != req['script']:\n"
+    "                tb = tb.tb_next\n"
+    "            traceback.print_exception(e.with_traceback(tb or e.__traceback__))\n"
+    "        finally:\n"
+    "            sys.stdout.flush()\n"
+    "            sys.stderr.flush()\n"
+    "            os._exit(code)\n"
+    "    _, status = os.waitpid(pid, 0)\n"
+    "    print(os.waitstatus_to_exitcode(status), flush=True)\n"
+)
+
+
+# Compilatore Java persistente (javac_daemon=True): una JVM con javax.tools
+# servita da javac. Protocollo: gli argomenti di javac uno per riga su stdin,
+# una riga vuota chiude la richiesta; la risposta è "<ret> <byte>\n" seguita
+# dai byte della diagnostica. System.out passa su stderr per non sporcare il canale.
+_JAVAC_DAEMON_CLASS = "JavacDaemon"
+_JAVAC_DAEMON_SOURCE = """\
+import java.io.*;
+import java.nio.charset.StandardCharsets;
+import java.util.*;
+import javax.tools.*;
+
+public class JavacDaemon {
+    public static void main(String[] argv) throws IOException {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        PrintStream reply = new PrintStream(new FileOutputStream(FileDescriptor.out), false, "UTF-8");
+        System.setOut(System.err);
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        List<String> args = new ArrayList<>();
+        String line;
+        while ((line = in.readLine()) != null) {
+            if (!line.isEmpty()) {
+                args.add(line);
+                continue;
+            }
+            ByteArrayOutputStream diagnostics = new ByteArrayOutputStream();
+            int ret = compiler.run(null, diagnostics, diagnostics, args.toArray(new String[0]));
+            byte[] message = diagnostics.toByteArray();
+            reply.print(ret + " " + message.length + "\\n");
+            reply.write(message);
+            reply.flush();
+            args.clear();
+        }
+    }
+}
+"""
+
+
+# lru_cache non evita che thread concorrenti lancino ognuno la propria query:
+# il lock fa partire un solo sottoprocesso per interprete
+_python_config_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _query_python_config(interpreter: str) -> Dict[str, str]:
+    """
+    Interroga l'interprete con un solo sottoprocesso. La cache è a livello di
+    modulo: tutte le istanze (anche quelle dei worker) la condividono.
+    """
+    output = subprocess.check_output([interpreter, '-c', _PYTHON_CONFIG_SCRIPT]).decode()
+    include, ext_suffix, pybind_includes, cache_tag = output.split("\0")
+    return {
+        "include": include.strip(),
+        "ext_suffix": ext_suffix.strip(),
+        "pybind_includes": pybind_includes.strip(),
+        "cache_tag": cache_tag.strip(),
+    }
 
 
 class UniversalBuilder:
@@ -44,6 +369,9 @@ class UniversalBuilder:
     GCC_CPP_FLAGS = "-O3 -Wall -std=c++14" 
     GCC_PYBIND_FLAGS = "-O3 -Wall -shared -std=c++14 -fPIC" 
 
+    # Limite dello store degli artefatti (byte): oltre, si eliminano i meno usati di recente
+    STORE_MAX_SIZE = 1 << 30
+
     # Mapping estensioni -> linguaggio
     EXTENSION_MAP = {
         '.cpp': 'cpp', '.cc': 'cpp', '.cxx': 'cpp',
@@ -52,28 +380,49 @@ class UniversalBuilder:
         '.py': 'python'
     }
 
+    # Oltre questa dimensione l'hashing rilascia le pagine lette (POSIX_FADV_DONTNEED):
+    # i sorgenti piccoli restano in page cache perché il compilatore li rilegge subito
+    _FADVISE_DONTNEED_MIN_SIZE = 64 << 20
+    # Oltre questa dimensione (es. Cargo.lock, wheel) si hasha il file via mmap
+    _HASH_MMAP_MIN_SIZE = 2 << 20
+
     def __init__(self, verbose: bool = True, cache_enabled: bool = True,
                  cache_dir: str = ".builder_cache", python_venv_path: Optional[str] = None,
-                 parallel_enabled: bool = True, max_workers: Optional[int] = None):
+                 parallel_enabled: bool = True, max_workers: Optional[int] = None,
+                 reuse_interpreter: bool = False, create_venv: bool = False,
+                 javac_daemon: bool = False):
         
         self.verbose = verbose
         self.system = platform.system()
+        # Suffisso degli eseguibili, calcolato una volta (gli artefatti si lanciano per percorso assoluto)
+        self._exe_suffix = ".exe" if self.system == "Windows" else ""
         self.cache_enabled = cache_enabled
         self.cache_dir = Path(cache_dir)
         self.python_venv_path = python_venv_path
+        # Crea il venv (una volta, poi riusato da tutte le run) se python_venv_path non esiste
+        self.create_venv = create_venv
         self.parallel_enabled = parallel_enabled
+        # Script Python eseguiti da un interprete già avviato (fork per run, solo POSIX)
+        self.reuse_interpreter = reuse_interpreter
+        # javac servito da una JVM già avviata (Compiler API, solo POSIX)
+        self.javac_daemon = javac_daemon
         
         # Aggiunti per coerenza
         self.PYBIND11_AVAILABLE = PYBIND11_AVAILABLE
         self.MATURIN_AVAILABLE = MATURIN_AVAILABLE
 
 
-        # Configura numero di worker paralleli
+        # Configura numero di worker paralleli (cpu_count letto una volta sola)
+        self._cpu_count = os.cpu_count()
         if max_workers is None:
-            self.max_workers = os.cpu_count() or 2
+            self.max_workers = self._cpu_count or 2
         else:
             self.max_workers = max_workers
 
+        # Job interni di ogni compilatore (codegen-units, cargo, JVM di javac):
+        # le build parallele ne ricevono una quota per non moltiplicare i thread
+        self.build_jobs = self.max_workers
+
         if self.verbose and self.parallel_enabled:
             print(f"⚙️  Parallelizzazione abilitata: {
                   self.max_workers} worker")
@@ -81,10 +430,33 @@ class UniversalBuilder:
         # Configura Python interpreter
         self._configure_python_interpreter()
 
+        # Wrapper di cache del compilatore (ccache/sccache), se installati
+        self.cpp_launcher, self.rust_launcher = self._detect_compiler_launchers(self.system)
+        if self.verbose and (self.cpp_launcher or self.rust_launcher):
+            names = [Path(l[0]).stem if l else "-" for l in (self.cpp_launcher, self.rust_launcher)]
+            print(f"⚡ Cache compilatore: C++ {names[0]}, Rust {names[1]}")
+
+        # Pool di worker condiviso, creato alla prima build parallela
+        self._pool = None
+        self._py_worker: Optional[subprocess.Popen] = None
+        self._javac_proc: Optional[subprocess.Popen] = None
+        self._close_registered = False
+        # Build Java accodate dentro batch() (None = nessun batch attivo)
+        self._java_batch: Optional[List[Tuple]] = None
+        # Oggetti C++ appena compilati dai task fini della build mista
+        self._fresh_objects: frozenset = frozenset()
+        self._obj_tmp_dir: Optional[str] = None
+
         # Crea directory cache se non esiste
+        self._dirty_keys: set = set()
+        self._journal_lines = 0
+        self._file_hash_memo: Dict[str, Tuple[int, int, str]] = {}
+        self._dir_size_cache: Optional[Tuple[int, float]] = None
         if self.cache_enabled:
             self.cache_dir.mkdir(exist_ok=True)
             self._load_cache_index()
+            # L'indice viene scritto su disco una volta sola, all'uscita
+            atexit.register(self._flush_cache_index)
         else:
             self.cache_index = {}
 
@@ -93,6 +465,9 @@ class UniversalBuilder:
         if self.python_venv_path:
             venv_path = Path(self.python_venv_path)
 
+            if self.create_venv and not venv_path.exists():
+                self._create_venv(venv_path)
+
             if venv_path.is_dir():
                 if self.system == "Windows":
                     python_exe = venv_path / "Scripts" / "python.exe"
@@ -102,7 +477,8 @@ class UniversalBuilder:
                 python_exe = venv_path
 
             if python_exe.exists():
-                self.python_interpreter = str(python_exe)
+                # Percorso assoluto: resta valido anche con cwd= diverse nei sottoprocessi
+                self.python_interpreter = str(python_exe.absolute())
                 if self.verbose:
                     print(f"✅ Python interpreter configurato: {
                           self.python_interpreter}")
@@ -114,180 +490,736 @@ class UniversalBuilder:
         else:
             self.python_interpreter = sys.executable
 
+    def _create_venv(self, venv_path: Path):
+        """Crea il venv condiviso (con pip) al primo avvio; le run successive lo riusano."""
+        import venv
+        if self.verbose:
+            print(f"🔩 Creazione venv in {venv_path}...")
+        try:
+            venv.EnvBuilder(with_pip=True, symlinks=self.system != "Windows").create(venv_path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            if self.verbose:
+                print(f"❌ Creazione venv fallita: {e}")
+
+    @staticmethod
+    def _detect_compiler_launchers(system: str) -> Tuple[List[str], List[str]]:
+        """
+        Cerca ccache/sccache nel PATH. sccache copre sia C++ (anche cl.exe su
+        Windows) sia rustc; ccache solo g++ su Linux/macOS.
+        """
+        sccache = shutil.which("sccache")
+        ccache = shutil.which("ccache") if system != "Windows" else None
+
+        cpp_launcher = [ccache] if ccache else ([sccache] if sccache else [])
+        rust_launcher = [sccache] if sccache else []
+        return cpp_launcher, rust_launcher
+
     def _load_cache_index(self):
-        """Carica l'indice cache da disco."""
-        cache_index_file = self.cache_dir / "index.json"
+        """
+        Carica l'indice cache da disco: index.jsonl è un journal di record
+        {"key": ..., "entry": ...}, riapplicati in ordine (l'ultimo vince).
+        Un vecchio index.json viene letto una volta e convertito al primo salvataggio.
+        """
+        self._dir_size_cache = None
+        self._dirty_keys = set()
+        self.cache_index = {}
+        self._journal_lines = 0
         try:
-            if cache_index_file.exists():
-                with open(cache_index_file, 'r') as f:
-                    self.cache_index = json.load(f)
-            else:
-                self.cache_index = {}
+            self._apply_journal(self.cache_index)
+        except FileNotFoundError:
+            legacy_file = self.cache_dir / "index.json"
+            try:
+                data = legacy_file.read_bytes()
+                self.cache_index = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+                self._dirty_keys = set(self.cache_index)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                if self.verbose:
+                    print(f"⚠️ Errore caricamento cache: {e}")
         except Exception as e:
             if self.verbose:
                 print(f"⚠️ Errore caricamento cache: {e}")
-            self.cache_index = {}
+
+    def _apply_journal(self, index: Dict):
+        """
+        Riapplica index.jsonl su index e ne registra il numero di righe.
+        Una riga troncata (crash a metà append) viene ignorata.
+        """
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+        lines = (self.cache_dir / "index.jsonl").read_bytes().splitlines()
+        for line in lines:
+            try:
+                record = loads(line)
+                index[record["key"]] = record["entry"]
+            except (ValueError, KeyError, TypeError):
+                continue
+        self._journal_lines = len(lines)
 
     def _save_cache_index(self):
-        """Salva l'indice cache su disco."""
+        """
+        Salva su disco le voci modificate, accodandole a index.jsonl: costo
+        proporzionale alle modifiche, non alla dimensione dell'indice. Quando il
+        journal supera il doppio delle voci vive viene compattato (riscritto con
+        una riga per voce su un file temporaneo e rinominato).
+        index.lock protegge dagli altri processi: gli append lo prendono
+        condiviso, la compattazione esclusivo, così nessun record accodato tra
+        la sua lettura e il rename va perso.
+        """
         if not self.cache_enabled:
             return
         
         self.cache_dir.mkdir(exist_ok=True) 
         
-        cache_index_file = self.cache_dir / "index.json"
+        journal_file = self.cache_dir / "index.jsonl"
+        dumps = ((lambda obj: orjson.dumps(obj)) if ORJSON_AVAILABLE else
+                 (lambda obj: json.dumps(obj, separators=(",", ":")).encode()))
         try:
-            with open(cache_index_file, 'w') as f:
-                json.dump(self.cache_index, f, indent=2)
+            compact = (not journal_file.exists() or
+                       self._journal_lines + len(self._dirty_keys) > 2 * max(len(self.cache_index), 1))
+            with _file_lock(self.cache_dir / "index.lock", exclusive=compact):
+                if compact:
+                    # Compattazione: prima le voci scritte da altri processi, poi le nostre
+                    merged = dict(self.cache_index)
+                    try:
+                        self._apply_journal(merged)
+                    except FileNotFoundError:
+                        pass
+                    merged.update((key, self.cache_index[key]) for key in self._dirty_keys)
+                    self.cache_index = merged
+                    records = [dumps({"key": key, "entry": entry}) for key, entry in merged.items()]
+                    tmp_file = journal_file.with_suffix(f".{os.getpid()}.tmp")
+                    tmp_file.write_bytes(b"".join(r + b"\n" for r in records))
+                    os.replace(tmp_file, journal_file)
+                    self._journal_lines = len(records)
+                    (self.cache_dir / "index.json").unlink(missing_ok=True)
+                else:
+                    records = [dumps({"key": key, "entry": self.cache_index[key]})
+                               for key in self._dirty_keys if key in self.cache_index]
+                    data = b"".join(r + b"\n" for r in records)
+                    # Un'unica write in append: le righe di processi diversi non si mescolano
+                    with open(journal_file, "a+b") as f:
+                        if f.seek(0, os.SEEK_END):
+                            f.seek(-1, os.SEEK_END)
+                            if f.read(1) != b"\n":
+                                # Ultima riga troncata da un crash: non attaccarci la nuova
+                                data = b"\n" + data
+                        f.write(data)
+                    self._journal_lines += len(records)
+            self._dirty_keys = set()
+            self._dir_size_cache = None
         except Exception as e:
             if self.verbose:
                 print(f"⚠️  Errore salvataggio cache: {e}")
 
-    def _compute_file_hash(self, file_path: Path) -> str:
-        """Calcola hash SHA256 di un file."""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+    def _flush_cache_index(self):
+        """Salva l'indice solo se ci sono modifiche non ancora scritte."""
+        if self._dirty_keys:
+            self._save_cache_index()
 
-    def _compute_files_hash(self, file_paths: List[Path]) -> str:
-        """Calcola hash combinato di più file."""
-        combined_hash = hashlib.sha256()
-        # Ordina per percorso assoluto per hash consistenti
-        for file_path in sorted(file_paths, key=lambda p: str(p.resolve())):
+    def _compute_file_hash(self, file_path: Path, st: Optional[os.stat_result] = None) -> str:
+        """
+        Calcola l'hash di un file (xxh3_128 o BLAKE3 se installati, altrimenti SHA256).
+        Memoizzato in memoria su (mtime_ns, size): un file non toccato non viene riletto.
+        st: stat già fatto dal chiamante (evita una seconda syscall).
+        """
+        if st is None:
+            st = os.stat(file_path)
+        memo_key = str(file_path)
+        memo = self._file_hash_memo.get(memo_key)
+        if memo is not None and memo[0] == st.st_mtime_ns and memo[1] == st.st_size:
+            return memo[2]
+
+        # buffering=0: niente BufferedReader, si legge direttamente nel buffer
+        with open(file_path, "rb", buffering=0) as f:
+            fadvise = hasattr(os, "posix_fadvise")
+            if fadvise:
+                # Lettura sequenziale: il kernel può anticipare il read-ahead
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if XXHASH_AVAILABLE:
+                if st.st_size > self._HASH_MMAP_MIN_SIZE:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        digest = xxhash.xxh3_128(mm).hexdigest()
+                else:
+                    digest = xxhash.xxh3_128(f.readall()).hexdigest()
+            elif BLAKE3_AVAILABLE:
+                # mmap + SIMD, e più thread sui file grandi
+                blake3_hash = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                blake3_hash.update_mmap(file_path)
+                digest = blake3_hash.hexdigest()
+            elif st.st_size > self._HASH_MMAP_MIN_SIZE:
+                # File grandi: un solo update sul mmap, nessuna copia in buffer Python
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    digest = hashlib.sha256(mm).hexdigest()
+            else:
+                # hashlib.file_digest (Python 3.11+, sempre presente con il 3.12
+                # richiesto): buffer riusato, nessun bytes allocato per blocco
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+
+            if fadvise and st.st_size >= self._FADVISE_DONTNEED_MIN_SIZE:
+                # File grandi: non lasciarli nella page cache a scapito della toolchain
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+        self._file_hash_memo[memo_key] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def _stat_sources(self, src_files: List[Union[str, Path]], shared_root: bool = False
+                      ) -> Optional[Tuple[List[Path], Dict[str, os.stat_result]]]:
+        """
+        Un solo stat per sorgente: verifica che esista (file regolare) PRIMA di
+        risolverne il percorso, così un file mancante non costa la realpath.
+        Restituisce (percorsi risolti, {percorso: stat_result}) per cache e
+        hashing, oppure None. shared_root=True risolve la directory comune una
+        volta sola (_resolve_paths), altrimenti ogni file con _resolve_path.
+        """
+        stats = []
+        for file_path, st in zip(src_files, self._batch_stat(src_files)):
+            if st is None or not stat.S_ISREG(st.st_mode):
+                print(f"❌ File sorgente non trovato: {os.path.abspath(file_path)}")
+                return None
+            stats.append(st)
+        src_paths = (_resolve_paths(src_files) if shared_root
+                     else [_resolve_path(f) for f in src_files])
+        return src_paths, {str(p): st for p, st in zip(src_paths, stats)}
+
+    # Sotto questa soglia uno stat alla volta costa meno di avviare i thread
+    _BATCH_STAT_MIN_PARALLEL = 32
+
+    @classmethod
+    def _batch_stat(cls, file_paths: List[Path]) -> List[Optional[os.stat_result]]:
+        """
+        stat di molti file (None se mancante), nello stesso ordine. Per liste
+        lunghe le syscall si sovrappongono su un pool di thread (os.stat rilascia
+        il GIL): la latenza conta soprattutto su dischi di rete.
+        """
+        def safe_stat(file_path):
             try:
-                file_hash = self._compute_file_hash(file_path)
+                return os.stat(file_path)
+            except OSError:
+                return None
+
+        if len(file_paths) < cls._BATCH_STAT_MIN_PARALLEL:
+            return [safe_stat(p) for p in file_paths]
+        with ThreadPoolExecutor(max_workers=min(16, len(file_paths))) as executor:
+            return list(executor.map(safe_stat, file_paths))
+
+    @staticmethod
+    def _compute_files_stats(file_paths: List[Path],
+                             stat_results: Optional[Dict[str, os.stat_result]] = None
+                             ) -> Optional[Dict[str, List[int]]]:
+        """Impronta {percorso: [mtime_ns, size]} dei file; None se uno manca."""
+        stats = {}
+        for file_path in file_paths:
+            st = stat_results.get(str(file_path)) if stat_results else None
+            if st is None:
+                try:
+                    st = os.stat(file_path)
+                except FileNotFoundError:
+                    return None
+            stats[str(file_path)] = [st.st_mtime_ns, st.st_size]
+        return stats
+
+    def _compute_files_hash(self, file_paths: List[Path],
+                            stat_results: Optional[Dict[str, os.stat_result]] = None) -> str:
+        """
+        Calcola hash combinato di più file.
+        I singoli file vengono hashati in parallelo (hashlib rilascia il GIL).
+        """
+        # Ordina per percorso assoluto per hash consistenti
+        sorted_paths = sorted(file_paths, key=lambda p: str(_resolve_path(p)))
+
+        stat_results = stat_results or {}
+        hash_one = lambda p: self._try_compute_file_hash(p, stat_results.get(str(p)))
+        if len(sorted_paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(sorted_paths))) as executor:
+                file_hashes = list(executor.map(hash_one, sorted_paths))
+        else:
+            file_hashes = [hash_one(p) for p in sorted_paths]
+
+        combined_hash = hashlib.sha256()
+        for file_hash in file_hashes:
+            if file_hash is not None:
                 combined_hash.update(file_hash.encode())
-            except FileNotFoundError:
-                if self.verbose:
-                    print(f"⚠️  File non trovato durante hashing: {file_path}")
-                continue
         return combined_hash.hexdigest()
 
-    def _is_cached(self, file_paths: List[Path], exe_name: str) -> bool:
-        """Verifica se i file sono in cache e validi."""
+    def _try_compute_file_hash(self, file_path: Path,
+                               st: Optional[os.stat_result] = None) -> Optional[str]:
+        """Come _compute_file_hash, ma restituisce None se il file non esiste."""
+        try:
+            return self._compute_file_hash(file_path, st)
+        except FileNotFoundError:
+            if self.verbose:
+                print(f"⚠️  File non trovato durante hashing: {file_path}")
+            return None
+
+    @staticmethod
+    def _cache_key(file_paths: List[Path], artifact_name: str) -> str:
+        """
+        Chiave compatta "<artefatto>::<blake2b dei percorsi ordinati>"
+        (al posto della lista di percorsi serializzata come stringa).
+        Memoizzata (vedi _cache_key_cached): controllo e aggiornamento della
+        cache, e le build ripetute, non rifanno ordinamento e hash.
+        """
+        path_strs = tuple(os.fspath(f) for f in file_paths)
+        relative = not all(os.path.isabs(p) for p in path_strs)
+        return _cache_key_cached(path_strs, artifact_name, os.getcwd() if relative else "")
+
+    @staticmethod
+    def _build_signature(*parts: str) -> str:
+        """
+        Impronta breve della configurazione di build (compilatore, flag...):
+        se cambia, l'artefatto in cache non vale più anche a sorgenti invariati.
+        """
+        return hashlib.blake2b("\0".join(parts).encode(), digest_size=8).hexdigest()
+
+    def _cpp_signature(self, pybind: bool = False) -> str:
+        """Impronta della configurazione C++/PyBind11 corrente."""
+        if self.system == "Windows":
+            flags = self.MSVC_PYBIND_FLAGS if pybind else self.MSVC_CPP_FLAGS
+        else:
+            flags = self.GCC_PYBIND_FLAGS if pybind else self.GCC_CPP_FLAGS
+        parts = [self.system, "pybind" if pybind else "cpp", flags]
+        if pybind:
+            parts.append(self.python_interpreter)
+        return self._build_signature(*parts)
+
+    def _is_cached(self, file_paths: List[Path], exe_name: str,
+                   cache_key: Optional[str] = None,
+                   stat_results: Optional[Dict[str, os.stat_result]] = None,
+                   signature: str = "") -> bool:
+        """
+        Verifica se i file sono in cache e validi.
+        signature (da _build_signature) deve coincidere con quella della build in cache.
+        """
         if not self.cache_enabled:
             return False
 
-        cache_key_base = str(sorted([str(f.resolve()) for f in file_paths]))
-        cache_key = f"{exe_name}::{cache_key_base}"
-
+        if cache_key is None:
+            cache_key = self._cache_key(file_paths, exe_name)
 
         if cache_key not in self.cache_index:
             return False
 
         cache_info = self.cache_index[cache_key]
-        current_hash = self._compute_files_hash(file_paths)
+        if cache_info.get("signature", "") != signature:
+            # Stessi sorgenti ma compilatore/flag diversi
+            return False
+        exe_path = Path(cache_info.get("exe_path", ""))
+        try:
+            exe_mtime_ns = exe_path.stat().st_mtime_ns
+        except OSError:
+            return False
 
-        if cache_info.get("hash") == current_hash:
-            exe_path = Path(cache_info.get("exe_path", ""))
-            if exe_path.exists():
-                return True
+        # Percorso veloce: stesse mtime/size registrate -> nessun hashing
+        current_stats = self._compute_files_stats(file_paths, stat_results)
+        if current_stats is not None and current_stats == cache_info.get("stats"):
+            return True
+
+        # Come make, ma solo per voci senza impronta: se l'impronta c'è e non
+        # coincide, un sorgente sostituito con una mtime più vecchia (mv, cp -p,
+        # archivi) non deve passare per aggiornato -> decide l'hash
+        if (cache_info.get("stats") is None and current_stats
+                and exe_mtime_ns >= max(m for m, _ in current_stats.values())):
+            return True
+
+        # mtime/size cambiati (o voce senza impronta): decide il contenuto,
+        # ma solo se la voce è stata hashata con lo stesso algoritmo
+        if cache_info.get("algo", "sha256") != _FILE_HASH_ALGO:
+            return False
+        if cache_info.get("hash") == self._compute_files_hash(file_paths, stat_results):
+            # File solo "toccati": aggiorna l'impronta per il prossimo controllo
+            if current_stats is not None:
+                cache_info["stats"] = current_stats
+                self._dirty_keys.add(cache_key)
+            return True
 
         return False
 
-    def _update_cache(self, file_paths: List[Path], exe_path: Path):
-        """Aggiorna l'indice cache."""
+    def _update_cache(self, file_paths: List[Path], exe_path: Path,
+                      cache_key: Optional[str] = None,
+                      stat_results: Optional[Dict[str, os.stat_result]] = None,
+                      signature: str = ""):
+        """
+        Aggiorna l'indice cache.
+        L'hash dei file appena verificati da _is_cached arriva dalla memo in memoria.
+        Una voce identica a quella già presente (a meno del timestamp) non
+        viene riscritta né accodata al journal.
+        """
         if not self.cache_enabled:
             return
 
-        cache_key_base = str(sorted([str(f.resolve()) for f in file_paths]))
-        cache_key = f"{exe_path.name}::{cache_key_base}"
-        
-        current_hash = self._compute_files_hash(file_paths)
+        if cache_key is None:
+            cache_key = self._cache_key(file_paths, exe_path.name)
+
+        current_hash = self._compute_files_hash(file_paths, stat_results)
 
-        self.cache_index[cache_key] = {
+        entry = {
             "hash": current_hash,
+            "algo": _FILE_HASH_ALGO,
             "exe_path": str(exe_path),
-            "timestamp": datetime.now().isoformat(),
-            "files": [str(f) for f in file_paths]
+            "timestamp": None,
+            "files": [str(f) for f in file_paths],
+            "stats": self._compute_files_stats(file_paths, stat_results),
+            "signature": signature
         }
+        previous = self.cache_index.get(cache_key)
+        if previous is not None and previous == {**entry, "timestamp": previous.get("timestamp")}:
+            return
+        entry["timestamp"] = datetime.now().isoformat()
+        self.cache_index[cache_key] = entry
+        self._dirty_keys.add(cache_key)
+        self._dir_size_cache = None
+
+    @staticmethod
+    def _compute_cache_key(src_hash: str, signature: str, artifact_name: str) -> str:
+        """
+        Chiave dello store degli artefatti: contenuto dei sorgenti (hash combinato),
+        configurazione di build e nome dell'artefatto. Non dipende dal percorso:
+        stessi sorgenti in un'altra directory (o tornati a una versione già
+        compilata) ritrovano lo stesso artefatto.
+        """
+        joined = "\0".join((src_hash, signature, artifact_name)).encode()
+        return hashlib.blake2b(joined, digest_size=16).hexdigest()
+
+    def _store_path(self, store_key: str) -> Path:
+        """Percorso dell'artefatto nello store, dentro la directory cache."""
+        return self.cache_dir.resolve() / "store" / store_key
 
-        self._save_cache_index()
+    @staticmethod
+    def _link_or_copy(src: Path, dest: Path) -> bool:
+        """
+        Porta src in dest in modo atomico: hardlink (nessuna copia) su un file
+        temporaneo accanto a dest, poi os.replace. Copia se i link non sono supportati.
+        """
+        try:
+            # Già lo stesso inode: rename() tra due link dello stesso file non fa
+            # nulla e lascerebbe il temporaneo al suo posto
+            if os.path.samefile(src, dest):
+                return True
+        except OSError:
+            pass
+        tmp_path = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            try:
+                os.link(src, tmp_path)
+            except OSError:
+                shutil.copy2(src, tmp_path)
+            os.replace(tmp_path, dest)
+            return True
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return False
 
-    @contextmanager
-    def _work_in_directory(self, path: Path):
+    def _serialize_compiled(self, artifact_path: Path, store_key: str):
+        """Registra nello store l'artefatto appena compilato (se non c'è già)."""
+        store_path = self._store_path(store_key)
+        if store_path.exists():
+            return
+        store_path.parent.mkdir(exist_ok=True)
+        if self._link_or_copy(artifact_path, store_path):
+            self._prune_store()
+
+    def _prune_store(self):
         """
-        Context manager per cambiare temporaneamente la directory di lavoro.
-        ATTENZIONE: NON SICURO PER I THREAD (USA cwd INVECE)
+        Mantiene lo store entro STORE_MAX_SIZE: ogni build diversa vi aggiunge
+        un artefatto completo. Si eliminano per primi quelli con mtime più
+        vecchia (rinfrescata a ogni riuso da _try_finish_recompile), cioè LRU.
+        L'artefatto di lavoro è un link a parte e resta al suo posto.
         """
-        original_dir = Path.cwd()
+        entries = []
+        total = 0
         try:
-            os.chdir(path)
-            yield
-        finally:
-            os.chdir(original_dir)
+            with os.scandir(self.cache_dir.resolve() / "store") as it:
+                for entry in it:
+                    if entry.is_file(follow_symlinks=False) and not entry.name.endswith(".tmp"):
+                        st = entry.stat(follow_symlinks=False)
+                        entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                        total += st.st_size
+        except OSError:
+            return
+        if total <= self.STORE_MAX_SIZE:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.STORE_MAX_SIZE:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+        self._dir_size_cache = None
+
+    def _try_finish_recompile(self, store_key: str, dest: Path) -> bool:
+        """
+        Se lo store ha già l'artefatto per questa chiave lo collega in dest
+        e la compilazione non serve. False se manca (o dest non è sostituibile).
+        """
+        store_path = self._store_path(store_key)
+        if not (store_path.is_file() and self._link_or_copy(store_path, dest)):
+            return False
+        try:
+            # Riuso: l'ordine LRU di _prune_store segue la mtime
+            os.utime(store_path)
+        except OSError:
+            pass
+        return True
 
-    def _run_command(self, cmd: str, cwd: Optional[Path] = None) -> Tuple[int, str, str]:
-        """Esegue un comando shell e restituisce (returncode, stdout, stderr)."""
+    def _run_command(self, cmd: List[str], cwd: Optional[Path] = None,
+                     env: Optional[Dict[str, str]] = None) -> Tuple[int, str, str]:
+        """
+        Esegue un comando (lista argv, senza shell intermedia) e restituisce
+        (returncode, stdout, stderr).
+        """
         if self.verbose:
             # Stampa la directory di lavoro se specificata
             cwd_str = f" in {cwd}" if cwd else ""
-            print(f"▶️ Eseguo{cwd_str}: {cmd}")
+            print(f"▶️ Eseguo{cwd_str}: {self._format_command(cmd)}")
         try:
             result = subprocess.run(
                 cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 timeout=300,
-                cwd=cwd # <--- Passa cwd a subprocess.run
+                cwd=cwd, # <--- Passa cwd a subprocess.run
+                env=env
             )
-            return result.returncode, result.stdout, result.stderr
+            return (result.returncode,
+                    self._decode_output(result.stdout),
+                    self._decode_output(result.stderr))
         except subprocess.TimeoutExpired:
             return 1, "", "Timeout: il comando ha impiegato più di 5 minuti."
         except Exception as e:
             return 1, "", f"Errore imprevisto durante l'esecuzione: {str(e)}"
 
+    async def _run_command_async(self, cmd: List[str], cwd: Optional[Path] = None,
+                                 env: Optional[Dict[str, str]] = None,
+                                 on_line: Optional[Callable[[str, str], None]] = None
+                                 ) -> Tuple[int, str, str]:
+        """
+        Come _run_command, ma legge stdout/stderr riga per riga mentre il processo
+        gira. Con on_line(stream, riga) le righe non vengono accumulate in memoria
+        (e stdout/stderr restituiti sono vuoti).
+        """
+        if self.verbose:
+            cwd_str = f" in {cwd}" if cwd else ""
+            print(f"▶️ Eseguo{cwd_str}: {self._format_command(cmd)}")
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                env=env,
+                limit=1 << 20  # Righe lunghe (es. template C++) fino a 1 MiB
+            )
+        except Exception as e:
+            return 1, "", f"Errore imprevisto durante l'esecuzione: {str(e)}"
+
+        async def consume(stream, name: str) -> str:
+            chunks = []
+            async for raw_line in stream:
+                line = self._decode_output(raw_line)
+                if on_line is not None:
+                    on_line(name, line)
+                else:
+                    chunks.append(line)
+            return "".join(chunks)
+
+        try:
+            stdout, stderr, _ = await asyncio.wait_for(
+                asyncio.gather(consume(proc.stdout, "stdout"),
+                               consume(proc.stderr, "stderr"),
+                               proc.wait()),
+                timeout=300)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return 1, "", "Timeout: il comando ha impiegato più di 5 minuti."
+        except Exception as e:
+            proc.kill()
+            await proc.wait()
+            return 1, "", f"Errore imprevisto durante l'esecuzione: {str(e)}"
+        return proc.returncode, stdout, stderr
+
+    # stderr restituito dopo un run fallito in streaming: la diagnostica è già a schermo
+    _STREAMED_FAILURE_NOTE = "(diagnostica già mostrata sopra)"
+
+    def _run_command_streaming(self, cmd: List[str], cwd: Optional[Path] = None,
+                               env: Optional[Dict[str, str]] = None) -> Tuple[int, str, str]:
+        """
+        Esegue un comando stampando l'output in tempo reale. stdout e stderr
+        sono già stampati e non vengono restituiti: in caso di errore stderr è
+        solo _STREAMED_FAILURE_NOTE (o il messaggio di timeout/avvio), così il
+        blocco "ERRORE:" dei chiamanti non ripete la diagnostica.
+        Dentro un event loop già attivo (es. Jupyter) usa un thread lettore per pipe.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            return self._run_command_threaded(cmd, cwd=cwd, env=env)
+
+        ret_code, _, error = asyncio.run(self._run_command_async(
+            cmd, cwd=cwd, env=env, on_line=lambda _, line: print(line, end="")))
+        return ret_code, "", error or (self._STREAMED_FAILURE_NOTE if ret_code != 0 else "")
+
+    def _run_command_threaded(self, cmd: List[str], cwd: Optional[Path] = None,
+                              env: Optional[Dict[str, str]] = None) -> Tuple[int, str, str]:
+        """
+        Variante di _run_command_streaming senza asyncio: Popen con un thread
+        lettore per stdout e uno per stderr, righe stampate man mano (valori
+        restituiti come in _run_command_streaming).
+        """
+        if self.verbose:
+            cwd_str = f" in {cwd}" if cwd else ""
+            print(f"▶️ Eseguo{cwd_str}: {self._format_command(cmd)}")
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    bufsize=16384, cwd=cwd, env=env)
+        except Exception as e:
+            return 1, "", f"Errore imprevisto durante l'esecuzione: {str(e)}"
+
+        def pump(stream):
+            for raw_line in stream:
+                print(self._decode_output(raw_line), end="")
+
+        readers = [threading.Thread(target=pump, args=(stream,), daemon=True)
+                   for stream in (proc.stdout, proc.stderr)]
+        for reader in readers:
+            reader.start()
+        try:
+            proc.wait(timeout=300)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            return 1, "", "Timeout: il comando ha impiegato più di 5 minuti."
+        finally:
+            for reader in readers:
+                reader.join()
+        return proc.returncode, "", self._STREAMED_FAILURE_NOTE if proc.returncode != 0 else ""
+
+    def _format_command(self, cmd: List[str]) -> str:
+        """Rappresentazione leggibile (e copiabile nella shell) di un argv."""
+        if self.system == "Windows":
+            return subprocess.list2cmdline(cmd)
+        return shlex.join(cmd)
+
+    @staticmethod
+    def _decode_output(data: bytes) -> str:
+        """
+        Decodifica l'output di un processo come farebbe text=True, ma senza
+        eccezioni su byte non validi (es. messaggi di cl.exe in codepage locale).
+        """
+        if not data:
+            return ""
+        return data.decode(locale.getpreferredencoding(False), errors="replace")
+
     # ===== NUOVI METODI HELPER PER REFACTORING (DRY) =====
 
-    def _execute_and_print(self, run_cmd: str, cwd: Path) -> bool:
+    def _execute_and_print(self, run_cmd: List[str], cwd: Path) -> bool:
         """
         [HELPER] Esegue un comando, stampa il suo output formattato 
         e restituisce True/False.
         """
         ret_code, stdout, stderr = self._run_command(run_cmd, cwd=cwd)
+        return self._print_execution_output(ret_code, stdout, stderr)
 
-        print("--- OUTPUT ESECUZIONE ---")
+    @staticmethod
+    def _print_execution_output(ret_code: int, stdout: str, stderr: str) -> bool:
+        """
+        Stampa l'output di un'esecuzione nel formato standard e restituisce True/False.
+        Il blocco va su stdout con una sola write: meno syscall e, con i worker
+        a thread, nessun interleaving tra gli output di esecuzioni diverse.
+        """
+        parts = ["--- OUTPUT ESECUZIONE ---"]
         if stdout:
-            print(stdout.strip())
+            parts.append(stdout.strip())
         if stderr:
-            print(f"ERRORE ESECUZIONE:\n{stderr.strip()}")
-        print("-------------------------")
+            parts.append(f"ERRORE ESECUZIONE:\n{stderr.strip()}")
+        parts.append("-------------------------\n")
+        sys.stdout.write("\n".join(parts))
+        sys.stdout.flush()
         return ret_code == 0
 
     def _get_or_build_artifact(self, 
                                src_paths: List[Path], 
                                artifact_name: str, 
-                               build_command_generator: Callable[[List[Path], str], Optional[str]],
-                               build_cwd: Path) -> Optional[Path]:
+                               build_command_generator: Callable[[List[Path], str], Optional[List[str]]],
+                               build_cwd: Path,
+                               msvc: bool = False,
+                               compile_commands_generator: Optional[
+                                   Callable[[List[Path]], Optional[List[List[str]]]]] = None,
+                               stat_results: Optional[Dict[str, os.stat_result]] = None,
+                               signature: str = ""
+                               ) -> Optional[Path]:
         """
         [HELPER] Metodo orchestratore che gestisce cache e compilazione.
         Restituisce il percorso dell'artefatto (da cache o compilato).
+        Con msvc=True, su Windows il comando gira nell'ambiente di vcvars64.
+        Se compile_commands_generator restituisce dei comandi (uno per unità di
+        compilazione), questi girano in parallelo prima del comando di build/link.
+        stat_results (da _stat_sources) evita di rifare lo stat dei sorgenti;
+        signature identifica compilatore/flag usati (vedi _build_signature).
         """
         
         artifact_path = build_cwd / artifact_name
+        cache_key = self._cache_key(src_paths, artifact_name)
 
         # 1. Logica Cache
-        if self._is_cached(src_paths, artifact_name):
+        if self._is_cached(src_paths, artifact_name, cache_key, stat_results, signature):
             if self.verbose:
                 print(f"⚡ Artefatto [cache]: {artifact_path.name}")
             return artifact_path
 
-        # 2. Logica di Build (non in cache)
+        # 2. Store per contenuto: artefatto già compilato da questi sorgenti/flag
+        store_key = None
+        if self.cache_enabled:
+            store_key = self._compute_cache_key(
+                self._compute_files_hash(src_paths, stat_results), signature, artifact_name)
+            if self._try_finish_recompile(store_key, artifact_path):
+                if self.verbose:
+                    print(f"⚡ Artefatto [store]: {artifact_path.name}")
+                self._update_cache(src_paths, artifact_path, cache_key, stat_results, signature)
+                return artifact_path
+
+        # 3. Logica di Build (non in cache)
         if self.verbose:
             file_names = ", ".join([p.name for p in src_paths])
             print(f"🔩 Compilazione: {file_names} → {artifact_name}")
             
+        compile_cmds = []
+        if compile_commands_generator is not None:
+            compile_cmds = compile_commands_generator(src_paths)
         build_cmd = build_command_generator(src_paths, artifact_name)
         
-        if not build_cmd:
+        if not build_cmd or compile_cmds is None:
              print(f"❌ Impossibile generare il comando di build per {
                    artifact_name}.")
              return None
 
-        ret_code, stdout, stderr = self._run_command(build_cmd, cwd=build_cwd)
+        env = self._get_msvc_env() if msvc and self.system == "Windows" else None
+
+        # Un artefatto ripreso dallo store è un hardlink: il linker non deve
+        # riscriverlo sul posto, altrimenti cambierebbe anche la copia nello store
+        try:
+            if artifact_path.stat().st_nlink > 1:
+                artifact_path.unlink()
+        except OSError:
+            pass
+
+        # Oggetti C++ e cache incrementale di rustc finiscono nella directory cache
+        self._dir_size_cache = None
+        if compile_cmds and not self._run_commands_parallel(compile_cmds, build_cwd, env):
+            print(f"❌ Compilazione fallita.")
+            return None
+
+        # In verbose i messaggi del compilatore compaiono mentre arrivano
+        run = self._run_command_streaming if self.verbose else self._run_command
+        ret_code, stdout, stderr = run(build_cmd, cwd=build_cwd, env=env)
         
         if stdout:
             print(stdout)
@@ -297,37 +1229,62 @@ class UniversalBuilder:
                 print(f"ERRORE:\n{stderr}")
             return None
 
-        # 3. Successo e aggiornamento cache
+        # 4. Successo e aggiornamento cache
         print(f"✅ Compilazione riuscita: {artifact_name}")
-        self._update_cache(src_paths, artifact_path)
+        self._update_cache(src_paths, artifact_path, cache_key, stat_results, signature)
+        if store_key is not None:
+            self._serialize_compiled(artifact_path, store_key)
         return artifact_path
 
+    def _run_commands_parallel(self, cmds: List[List[str]], cwd: Path,
+                               env: Optional[Dict[str, str]] = None) -> bool:
+        """
+        [HELPER] Esegue comandi indipendenti (es. un TU C++ ciascuno) in parallelo,
+        come 'make -jN'. I thread bastano: il lavoro vero è nei sottoprocessi.
+        """
+        workers = min(self.max_workers, len(cmds))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda cmd: self._run_command(cmd, cwd=cwd, env=env), cmds))
+
+        all_success = True
+        for ret_code, stdout, stderr in results:
+            if stdout:
+                print(stdout)
+            if ret_code != 0:
+                all_success = False
+                if stderr:
+                    print(f"ERRORE:\n{stderr}")
+        return all_success
+
     # ======================================================
 
+    @property
+    def _python_config(self) -> Dict[str, str]:
+        """Valori di sysconfig dell'interprete configurato (condivisi tra le istanze)."""
+        with _python_config_lock:
+            return _query_python_config(self.python_interpreter)
+
     def _get_py_include(self) -> str:
         """Ottiene il percorso di include di Python."""
-        return subprocess.check_output([
-            self.python_interpreter, '-c',
-            'import sysconfig; print(sysconfig.get_path("include"))'
-        ]).decode().strip()
+        return self._python_config["include"]
 
-    def _get_pybind_include(self) -> str:
-        """Ottiene i percorsi di include di PyBind11."""
+    def _get_pybind_include(self) -> List[str]:
+        """Ottiene i flag -I di PyBind11 (uno per elemento, pronti per argv)."""
         if not self.PYBIND11_AVAILABLE:
             raise ImportError("PyBind11 non è installato")
-        return subprocess.check_output([
-            self.python_interpreter, '-m', 'pybind11', '--includes'
-        ]).decode().strip()
+        pybind_includes = self._python_config["pybind_includes"]
+        if not pybind_includes:
+            raise ImportError(f"PyBind11 non è installato in {self.python_interpreter}")
+        return pybind_includes.splitlines()
 
     def _get_ext_suffix(self) -> str:
         """Ottiene il suffisso per le estensioni native (.pyd o .so)."""
         try:
-            return subprocess.check_output([
-                self.python_interpreter, '-c',
-                'import sysconfig; print(sysconfig.get_config_var("EXT_SUFFIX"))'
-            ]).decode().strip()
+            ext_suffix = self._python_config["ext_suffix"]
         except subprocess.CalledProcessError:
-            return ".pyd" if self.system == "Windows" else ".so"
+            ext_suffix = ""
+        return ext_suffix or (".pyd" if self.system == "Windows" else ".so")
 
     # ===== METODO PRINCIPALE CON PARALLELIZZAZIONE =====
 
@@ -340,12 +1297,10 @@ class UniversalBuilder:
         if isinstance(file_paths, str):
             file_paths = [file_paths]
 
-        resolved_paths = [Path(f).resolve() for f in file_paths]
-
-        for path in resolved_paths:
-            if not path.exists():
-                print(f"❌ File non trovato: {path}")
-                return False
+        sources = self._stat_sources(file_paths)
+        if sources is None:
+            return False
+        resolved_paths = sources[0]
 
         files_by_lang = self._group_files_by_language(resolved_paths)
 
@@ -374,58 +1329,257 @@ class UniversalBuilder:
 
         for lang, files in files_by_lang.items():
             print(f"\n[{lang.upper()}] {len(files)} file")
-
-            if lang == 'cpp':
-                results[lang] = self.build_and_run_cpp(files, profile=profile)
-            elif lang == 'java':
-                results[lang] = self.build_and_run_java(files, profile=profile)
-            elif lang == 'rust':
-                results[lang] = self.build_and_run_rust(
-                    files[0], profile=profile)
-            elif lang == 'python':
-                results[lang] = self.build_and_run_python(
-                    files, profile=profile)
+            results[lang] = self._build_and_run_language(lang, files, profile)
 
         return self._print_mixed_results(results)
 
+    def _build_and_run_language(self, lang: str, files: List[Path], profile: bool) -> bool:
+        """Instrada un gruppo di file dello stesso linguaggio al builder corretto."""
+        if lang == 'cpp':
+            return self.build_and_run_cpp(files, profile=profile)
+        elif lang == 'java':
+            return self.build_and_run_java(files, profile=profile)
+        elif lang == 'rust':
+            # Usa il primo file per Rust (build_and_run_rust prende un solo file)
+            return self.build_and_run_rust(files[0], profile=profile)
+        elif lang == 'python':
+            return self.build_and_run_python(files, profile=profile)
+        return False
+
+    def _use_process_pool(self) -> bool:
+        """
+        Processi per la build parallela dove c'è fork (Linux e altri POSIX):
+        i worker nascono senza re-importare __main__, quindi anche uno script
+        senza 'if __name__ == "__main__":' funziona. Su Windows e macOS
+        resterebbe solo spawn, che il re-import lo richiede: lì thread
+        (il lavoro vero è comunque nei sottoprocessi dei compilatori).
+        """
+        return (self.system not in ("Windows", "Darwin")
+                and "fork" in multiprocessing.get_all_start_methods())
+
+    def _create_executor(self, config: Dict):
+        """
+        Crea l'executor per la compilazione parallela (processi o thread).
+        L'initializer prepara in ogni worker il builder leggero per i task.
+        """
+        if self._use_process_pool():
+            return ProcessPoolExecutor(max_workers=self.max_workers,
+                                       mp_context=multiprocessing.get_context("fork"),
+                                       initializer=_init_worker, initargs=(config,))
+        return ThreadPoolExecutor(max_workers=self.max_workers,
+                                  initializer=_init_worker, initargs=(config,))
+
+    def _get_pool(self, config: Dict):
+        """
+        Pool condiviso dall'istanza: creato alla prima build parallela e riusato
+        dalle successive (l'avvio dei processi si paga una volta sola).
+        """
+        if self._pool is None:
+            self._pool = self._create_executor(config)
+            self._register_close()
+        return self._pool
+
+    def _register_close(self):
+        """Registra close() all'uscita (una volta sola per istanza)."""
+        if not self._close_registered:
+            atexit.register(self.close)
+            self._close_registered = True
+
+    def close(self):
+        """Chiude il pool di worker condiviso, l'interprete Python riusato e il demone javac (se creati)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._py_worker is not None:
+            # EOF su stdin: il worker esce dal suo ciclo
+            try:
+                self._py_worker.stdin.close()
+                self._py_worker.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._py_worker.kill()
+            self._py_worker = None
+        if self._javac_proc is not None:
+            try:
+                self._javac_proc.stdin.close()
+                self._javac_proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._javac_proc.kill()
+            self._javac_proc = None
+
+    def _worker_config(self) -> Dict:
+        """
+        Configurazione "piatta" (picklable) da inviare ai processi worker
+        al posto dell'istanza UniversalBuilder.
+        """
+        return {
+            "verbose": self.verbose,
+            "system": self.system,
+            "_exe_suffix": self._exe_suffix,
+            # Con la cache disabilitata i worker linkano gli oggetti nella stessa directory
+            "_obj_tmp_dir": None if self.cache_enabled else str(self._object_root()),
+            "cache_enabled": self.cache_enabled,
+            "cache_dir": str(self.cache_dir.resolve()),
+            "python_venv_path": self.python_venv_path,
+            "python_interpreter": self.python_interpreter,
+            "parallel_enabled": False,
+            "reuse_interpreter": self.reuse_interpreter,
+            "max_workers": self.max_workers,
+            "build_jobs": self.build_jobs,
+            "PYBIND11_AVAILABLE": self.PYBIND11_AVAILABLE,
+            "MATURIN_AVAILABLE": self.MATURIN_AVAILABLE,
+            "MSVC_CPP_FLAGS": self.MSVC_CPP_FLAGS,
+            "MSVC_PYBIND_FLAGS": self.MSVC_PYBIND_FLAGS,
+            "GCC_CPP_FLAGS": self.GCC_CPP_FLAGS,
+            "GCC_PYBIND_FLAGS": self.GCC_PYBIND_FLAGS,
+            "cpp_launcher": self.cpp_launcher,
+            "rust_launcher": self.rust_launcher,
+        }
+
+    @classmethod
+    def _from_worker_config(cls, config: Dict) -> "UniversalBuilder":
+        """Ricrea un builder leggero nel worker (senza le stampe e i probe di __init__)."""
+        builder = cls.__new__(cls)
+        for key, value in config.items():
+            setattr(builder, key, value)
+        builder.cache_dir = Path(builder.cache_dir)
+        builder._dirty_keys = set()
+        builder._journal_lines = 0
+        builder._file_hash_memo = {}
+        builder._dir_size_cache = None
+        builder._cpu_count = os.cpu_count()
+        builder._pool = None
+        builder._py_worker = None
+        # Nel worker un demone non sopravvivrebbe al task: javac diretto
+        builder.javac_daemon = False
+        builder._javac_proc = None
+        builder._close_registered = False
+        builder._java_batch = None
+        builder._fresh_objects = frozenset(config.get("_fresh_objects", ()))
+        if builder.cache_enabled:
+            builder._load_cache_index()
+        else:
+            builder.cache_index = {}
+        return builder
+
+    def _submit_compile_tasks(self, files_by_lang: Dict) -> List[Tuple[str, Path, List[str]]]:
+        """
+        Scompone la build in task fini (lang, file, comando di compilazione)
+        indipendenti tra loro. Oggi solo i TU C++ di un eseguibile non in cache:
+        javac va invocato sull'insieme dei file (riferimenti incrociati) e
+        build_and_run_rust compila già un crate a file.
+        """
+        files = files_by_lang.get('cpp', [])
+        exe_name = files[0].stem + self._exe_suffix if files else ""
+        signature = self._cpp_signature()
+        if len(files) < 2 or self._is_cached(files, exe_name, self._cache_key(files, exe_name),
+                                             signature=signature):
+            return []
+        if self.cache_enabled:
+            # Il link troverà l'eseguibile nello store (_try_finish_recompile): niente TU
+            store_key = self._compute_cache_key(self._compute_files_hash(files), signature, exe_name)
+            if self._store_path(store_key).is_file():
+                return []
+        compile_tasks = self._get_cpp_compile_tasks(files) or []
+        return [('cpp', src, cmd) for src, cmd in compile_tasks]
+
     def _build_and_run_mixed_parallel(self, files_by_lang: Dict, profile: bool) -> bool:
-        """Compila in parallelo usando ThreadPoolExecutor con mapping corretto."""
+        """
+        Compila in parallelo (ProcessPoolExecutor, thread su Windows) con mapping corretto.
+        I TU C++ finiscono nello stesso pool degli altri linguaggi, così i worker
+        liberi aiutano quelli lenti; il link/esecuzione parte quando i suoi
+        oggetti sono pronti.
+        """
         print("\n🚀 Inizio compilazione parallela...\n")
         results = {}
         start_time = time.time()
-        tasks = {}
-
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            for lang, files in files_by_lang.items():
-                print(f"📨 Sottomesso: [{lang.upper()}]")
-                if lang == 'cpp':
-                    future = executor.submit(
-                        self.build_and_run_cpp, files, None, profile)
-                elif lang == 'java':
-                    future = executor.submit(
-                        self.build_and_run_java, files, profile)
-                elif lang == 'rust':
-                    # Usa il primo file per Rust (build_and_run_rust prende un solo file)
-                    future = executor.submit(
-                        self.build_and_run_rust, files[0], None, 'release', profile)
-                elif lang == 'python':
-                    future = executor.submit(
-                        self.build_and_run_python, files, profile)
-                tasks[lang] = future
-
-            future_to_lang = {future: lang for lang, future in tasks.items()}
-
-            print("\n⏳ In elaborazione...")
-            for future in as_completed(tasks.values(), timeout=600):
-                lang = future_to_lang[future]
+        config = self._worker_config()
+        # Ogni build in parallelo riceve la sua quota di core: cargo/rustc/javac
+        # non lanciano ciascuno un thread per core (N build x N thread)
+        concurrent_builds = max(1, min(self.max_workers, len(files_by_lang)))
+        config["build_jobs"] = max(1, (self._cpu_count or 2) // concurrent_builds)
+        # I worker ripartono dall'indice su disco: scrivi prima le modifiche pendenti
+        self._flush_cache_index()
+
+        compile_tasks = self._submit_compile_tasks(files_by_lang)
+        env = self._get_msvc_env() if compile_tasks and self.system == "Windows" else None
+        pending_compiles = defaultdict(int)
+        fresh_objects = defaultdict(list)
+        compile_ok = defaultdict(lambda: True)
+
+        executor = self._get_pool(config)
+        future_to_task = {}
+
+        def submit_language(lang):
+            print(f"📨 Sottomesso: [{lang.upper()}]")
+            # Il link riusa gli oggetti dei task fini invece di ricompilarli
+            lang_config = {**config, "_fresh_objects": fresh_objects[lang]} if fresh_objects[lang] else config
+            future = executor.submit(_build_and_run_worker, lang,
+                                     files_by_lang[lang], profile, lang_config)
+            future_to_task[future] = (lang, None)
+            return future
+
+        for lang, src, cmd in compile_tasks:
+            print(f"📨 Sottomesso: [{lang.upper()}] {src.name}")
+            future = executor.submit(_run_command_worker, cmd, src.parent, env, config)
+            future_to_task[future] = (lang, src)
+            pending_compiles[lang] += 1
+        for lang in files_by_lang:
+            if not pending_compiles[lang]:
+                submit_language(lang)
+
+        print("\n⏳ In elaborazione...")
+        deadline = time.time() + 600
+        not_done = set(future_to_task)
+        while not_done:
+            done, not_done = wait(not_done, timeout=max(0, deadline - time.time()),
+                                  return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError("Compilazione parallela oltre il timeout di 600s")
+            for future in done:
+                lang, src = future_to_task.pop(future)
+                if src is not None:
+                    # Task fine: un TU compilato
+                    try:
+                        (ret_code, stdout, stderr), output = future.result()
+                        if output:
+                            sys.stdout.write(output)
+                    except Exception as e:
+                        ret_code, stdout, stderr = 1, "", str(e)
+                        if isinstance(e, BrokenExecutor):
+                            self.close()
+                    if stdout:
+                        print(stdout)
+                    if ret_code != 0:
+                        compile_ok[lang] = False
+                        print(f"❌ Compilazione fallita: [{lang.upper()}] {src.name}")
+                        if stderr:
+                            print(f"ERRORE:\n{stderr}")
+                    else:
+                        fresh_objects[lang].append(str(self._get_object_path(src)))
+                    pending_compiles[lang] -= 1
+                    if not pending_compiles[lang]:
+                        if compile_ok[lang]:
+                            not_done.add(submit_language(lang))
+                        else:
+                            results[lang] = False
+                    continue
                 try:
-                    result = future.result()
+                    result, output = future.result()
+                    if output:
+                        sys.stdout.write(output)
                     results[lang] = result
                     status = "✅" if result else "❌"
                     print(f"{status} Completato: [{lang.upper()}]")
                 except Exception as e:
                     results[lang] = False
                     print(f"❌ Errore: [{lang.upper()}] - {e}")
+                    if isinstance(e, BrokenExecutor):
+                        # Un worker è morto: il pool non è più usabile, si ricrea alla prossima build
+                        self.close()
+
+        # I worker hanno aggiornato l'indice su disco: riallinea quello in memoria
+        if self.cache_enabled:
+            self._load_cache_index()
 
         elapsed = time.time() - start_time
         print(f"\n⏱️  Tempo totale: {elapsed:.3f}s")
@@ -446,16 +1600,17 @@ class UniversalBuilder:
 
     def _group_files_by_language(self, file_paths: List[Path]) -> Dict[str, List[Path]]:
         """Raggruppa file per linguaggio basandosi sull'estensione."""
-        groups = defaultdict(list)
+        groups: Dict[str, List[Path]] = {}
+        ext_get = self.EXTENSION_MAP.get  # Lookup del metodo fuori dal ciclo
         for file_path in file_paths:
             suffix = file_path.suffix.lower()
-            lang = self.EXTENSION_MAP.get(suffix)
-            if lang:
-                groups[lang].append(file_path)
-            else:
+            lang = ext_get(suffix)
+            if lang is None:
                 print(f"⚠️  Estensione non riconosciuta: {
                       suffix} ({file_path.name})")
-        return dict(groups)
+                continue
+            groups.setdefault(lang, []).append(file_path)
+        return groups
 
     # ===== ROUTER PRINCIPALE (MODIFICATO) =====
 
@@ -469,15 +1624,16 @@ class UniversalBuilder:
             if not file_path:
                 print("❌ Lista di file vuota")
                 return False
-            main_file_path = Path(file_path[0]).resolve()
+            main_file = file_path[0]
             files_to_compile = file_path
         else:
-            main_file_path = Path(file_path).resolve()
+            main_file = file_path
             files_to_compile = str(file_path)
 
-        if not main_file_path.exists():
-            print(f"❌ File non trovato: {main_file_path}")
+        sources = self._stat_sources([main_file])
+        if sources is None:
             return False
+        (main_file_path,), _ = sources
 
         suffix = main_file_path.suffix.lower()
         lang = self.EXTENSION_MAP.get(suffix)
@@ -548,15 +1704,13 @@ class UniversalBuilder:
         """Compila ed esegue uno o più file C++ (come ESEGUIBILE)."""
         if isinstance(src_files, str):
             src_files = [src_files]
-        src_paths = [Path(f).resolve() for f in src_files]
-        for src_path in src_paths:
-            if not src_path.exists():
-                print(f"❌ File sorgente non trovato: {src_path}")
-                return False
+        sources = self._stat_sources(src_files)
+        if sources is None:
+            return False
+        src_paths, stat_results = sources
 
         if exe_name is None:
-            exe_name = src_paths[0].stem + \
-                (".exe" if self.system == "Windows" else "")
+            exe_name = src_paths[0].stem + self._exe_suffix
         
         build_cwd = src_paths[0].parent
 
@@ -565,7 +1719,11 @@ class UniversalBuilder:
             src_paths,
             exe_name,
             self._get_cpp_build_command,  # Passa il metodo helper
-            build_cwd
+            build_cwd,
+            msvc=True,
+            compile_commands_generator=self._get_cpp_compile_commands,
+            stat_results=stat_results,
+            signature=self._cpp_signature()
         )
 
         if exe_path is None:
@@ -573,25 +1731,144 @@ class UniversalBuilder:
 
         # 2. Esegui l'artefatto
         print(f"✅ Esecuzione di '{exe_name}'...")
-        run_cmd = f".\\{
-            exe_name}" if self.system == "Windows" else f"./{exe_name}"
-        
-        return self._execute_and_print(run_cmd, cwd=build_cwd)
+        return self._execute_and_print([str(exe_path)], cwd=exe_path.parent)
 
     # <--- _compile_cpp_files ORA È OBSOLETO (logica in _get_or_build_artifact)
     
-    def _get_cpp_build_command(self, src_paths: List[Path], exe_name: str) -> Optional[str]:
-        """Costruisce il comando di compilazione C++ per la piattaforma corrente."""
-        src_files = " ".join([f'"{p.name}"' for p in src_paths])
+    def _get_cpp_compiler(self, launcher: bool = True) -> Optional[List[str]]:
+        """
+        Restituisce il compilatore C++ della piattaforma (cl.exe o g++),
+        preceduto da ccache/sccache se disponibile e launcher=True.
+        """
+        prefix = self.cpp_launcher if launcher else []
         if self.system == "Windows":
             try:
-                vcvars_path = self._find_vcvars64()
-                return f'call "{vcvars_path}" && cl {self.MSVC_CPP_FLAGS} {src_files} /Fe"{exe_name}"'
-            except FileNotFoundError as e:
+                return [*prefix, self._get_msvc_cl()]
+            except OSError as e:
                 print(f"❌ {e}")
                 return None
-        else:
-            return f'g++ {self.GCC_CPP_FLAGS} {src_files} -o "{exe_name}"'
+        return [*prefix, "g++"]
+
+    @functools.cached_property
+    def _cpp_flags(self) -> Tuple[str, ...]:
+        """Flag C++ della piattaforma, divisi una volta sola per istanza."""
+        return tuple((self.MSVC_CPP_FLAGS if self.system == "Windows" else self.GCC_CPP_FLAGS).split())
+
+    @functools.cached_property
+    def _pybind_flags(self) -> Tuple[str, ...]:
+        """
+        Flag PyBind11 della piattaforma con gli include di Python/PyBind11 già
+        tradotti (-I o /I). Se gli include non si trovano solleva e non viene memorizzato.
+        """
+        py_include = self._get_py_include()
+        pb_includes = self._get_pybind_include()
+        if self.system == "Windows":
+            return (*self.MSVC_PYBIND_FLAGS.split(), f"/I{py_include}",
+                    *["/I" + flag[2:] for flag in pb_includes])
+        return (*self.GCC_PYBIND_FLAGS.split(), f"-I{py_include}", *pb_includes)
+
+    def _get_cpp_flags(self, pybind: bool = False) -> Optional[Tuple[str, ...]]:
+        """Flag di compilazione C++ (con gli include di Python/PyBind11 se pybind=True)."""
+        if not pybind:
+            return self._cpp_flags
+        try:
+            return self._pybind_flags
+        except Exception as e:
+            print(f"❌ Errore nel trovare gli include di Python/PyBind11: {e}")
+            return None
+
+    def _get_object_path(self, src_path: Path, pybind: bool = False) -> Path:
+        """
+        File oggetto di un'unità di compilazione, nella directory cache (non
+        accanto ai sorgenti). Una sottodirectory per directory dei sorgenti e
+        l'impronta dei flag nel nome: oggetti di file omonimi o compilati con
+        flag diversi non si mescolano mai.
+        """
+        suffix = ".obj" if self.system == "Windows" else ".o"
+        source_dir = hashlib.blake2b(os.fsencode(src_path.parent), digest_size=8).hexdigest()
+        return (self._object_root() / source_dir /
+                f"{src_path.name}.{self._cpp_signature(pybind)}{suffix}")
+
+    def _object_root(self) -> Path:
+        """
+        Directory dei file oggetto: <cache_dir>/obj, oppure, con la cache
+        disabilitata, una directory temporanea dell'istanza (creata al primo
+        uso, cancellata all'uscita) invece di creare la cache nella cwd.
+        """
+        if self.cache_enabled:
+            return self.cache_dir.resolve() / "obj"
+        if self._obj_tmp_dir is None:
+            self._obj_tmp_dir = tempfile.mkdtemp(prefix="builder_obj_")
+            atexit.register(shutil.rmtree, self._obj_tmp_dir, True)
+        return Path(self._obj_tmp_dir)
+
+    def _get_cpp_compile_tasks(self, src_paths: List[Path],
+                               pybind: bool = False) -> Optional[List[Tuple[Path, List[str]]]]:
+        """
+        Coppie (sorgente, comando '-c'/'/c') per le unità di compilazione da
+        ricompilare: tutte, perché un TU dipende anche dagli header che include.
+        Fanno eccezione solo gli oggetti appena compilati dai task fini della
+        build mista (_fresh_objects). Con un solo sorgente restituisce [] e si
+        compila in un passo.
+        """
+        if len(src_paths) < 2:
+            return []
+        compiler = self._get_cpp_compiler()
+        flags = self._get_cpp_flags(pybind)
+        if compiler is None or flags is None:
+            return None
+
+        tasks = []
+        for p in src_paths:
+            obj_path = self._get_object_path(p, pybind)
+            if str(obj_path) in self._fresh_objects:
+                continue
+            obj_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.system == "Windows":
+                # Un cl per TU invece di /MP: i processi li distribuisce il pool
+                # (anche tra linguaggi) e /Fo resta un file, con l'impronta dei flag
+                tasks.append((p, [*compiler, *flags, "/c", p.name, f"/Fo{obj_path}"]))
+            else:
+                tasks.append((p, [*compiler, *flags, "-c", p.name, "-o", str(obj_path)]))
+        return tasks
+
+    def _get_cpp_compile_commands(self, src_paths: List[Path],
+                                  pybind: bool = False) -> Optional[List[List[str]]]:
+        """
+        Un comando '-c' (o '/c') per ogni unità di compilazione da aggiornare,
+        da eseguire in parallelo.
+        """
+        tasks = self._get_cpp_compile_tasks(src_paths, pybind)
+        return None if tasks is None else [cmd for _, cmd in tasks]
+
+    def _get_cpp_link_command(self, src_paths: List[Path], output_name: str,
+                              pybind: bool = False) -> Optional[List[str]]:
+        """
+        Comando di build finale: link dei file oggetto se i sorgenti sono più di uno
+        (già compilati da _get_cpp_compile_commands), altrimenti compilazione diretta.
+        """
+        # Il link non è cacheabile: niente wrapper se si collegano solo oggetti
+        compiler = self._get_cpp_compiler(launcher=len(src_paths) == 1)
+        if compiler is None:
+            return None
+
+        if len(src_paths) > 1:
+            objects = [str(self._get_object_path(p, pybind)) for p in src_paths]
+            if self.system == "Windows":
+                return [*compiler, *(["/LD"] if pybind else []), *objects, f"/Fe{output_name}"]
+            return [*compiler, *(["-shared"] if pybind else []), *objects, "-o", output_name]
+
+        flags = self._get_cpp_flags(pybind)
+        if flags is None:
+            return None
+        src_files = [p.name for p in src_paths]
+        if self.system == "Windows":
+            return [*compiler, *flags, *src_files, f"/Fe{output_name}"]
+        return [*compiler, *flags, *src_files, "-o", output_name]
+
+    def _get_cpp_build_command(self, src_paths: List[Path], exe_name: str) -> Optional[List[str]]:
+        """Costruisce il comando di compilazione C++ per la piattaforma corrente."""
+        return self._get_cpp_link_command(src_paths, exe_name)
 
     # ===== METODI DI COMPILAZIONE PYBIND11 (REFACTOR) =====
 
@@ -609,11 +1886,10 @@ class UniversalBuilder:
 
         if isinstance(src_files, str):
             src_files = [src_files]
-        src_paths = [Path(f).resolve() for f in src_files]
-        for src_path in src_paths:
-            if not src_path.exists():
-                print(f"❌ File sorgente non trovato: {src_path}")
-                return None
+        sources = self._stat_sources(src_files)
+        if sources is None:
+            return None
+        src_paths, stat_results = sources
 
         if module_name is None:
             module_name = src_paths[0].stem
@@ -631,7 +1907,11 @@ class UniversalBuilder:
             src_paths,
             module_filename,
             self._get_pybind_build_command, # Passa il metodo helper
-            build_cwd
+            build_cwd,
+            msvc=True,
+            compile_commands_generator=lambda paths: self._get_cpp_compile_commands(paths, pybind=True),
+            stat_results=stat_results,
+            signature=self._cpp_signature(pybind=True)
         )
 
         if module_path:
@@ -639,30 +1919,9 @@ class UniversalBuilder:
             
         return module_path
 
-    def _get_pybind_build_command(self, src_paths: List[Path], module_filename: str) -> Optional[str]:
+    def _get_pybind_build_command(self, src_paths: List[Path], module_filename: str) -> Optional[List[str]]:
         """Costruisce il comando di compilazione PyBind11."""
-        try:
-            py_include = self._get_py_include()
-            pb_includes_str = self._get_pybind_include()
-        except Exception as e:
-            print(f"❌ Errore nel trovare gli include di Python/PyBind11: {e}")
-            return None
-
-        src_files = " ".join([f'"{p.name}"' for p in src_paths])
-        if self.system == "Windows":
-            try:
-                vcvars_path = self._find_vcvars64()
-                msvc_includes = f'/I"{py_include}" {
-                    pb_includes_str.replace("-I", "/I")}'
-                return (f'call "{vcvars_path}" && cl {self.MSVC_PYBIND_FLAGS} {msvc_includes} '
-                        f'{src_files} /Fe"{module_filename}"')
-            except FileNotFoundError as e:
-                print(f"❌ {e}")
-                return None
-        else:
-            include_flags = f'-I"{py_include}" {pb_includes_str}'
-            return (f'g++ {self.GCC_PYBIND_FLAGS} {include_flags} '
-                    f'{src_files} -o "{module_filename}"')
+        return self._get_cpp_link_command(src_paths, module_filename, pybind=True)
 
     # ===== NUOVO: METODI DI COMPILAZIONE PYO3 (RUST) (NO REFACTOR) =====
 
@@ -680,11 +1939,10 @@ class UniversalBuilder:
         
         if isinstance(src_files, str):
             src_files = [src_files]
-        src_paths = [Path(f).resolve() for f in src_files]
-        for src_path in src_paths:
-            if not src_path.exists():
-                print(f"❌ File sorgente non trovato: {src_path}")
-                return None
+        sources = self._stat_sources(src_files)
+        if sources is None:
+            return None
+        src_paths = sources[0]
         
         if module_name and self.verbose:
             print(f"ℹ️  Nota: 'module_name' (\"_safe_str(module_name)\") è ignorato. Il nome del modulo è definito da Cargo.toml.")
@@ -699,24 +1957,38 @@ class UniversalBuilder:
             print("   Questo builder compila un progetto Cargo, non un singolo file Rust.")
             return None
 
-        try:
-            rust_source_files = list(src_dir.rglob("*.rs"))
-            rust_source_files.append(cargo_toml_path)
-            if (project_dir / "Cargo.lock").exists():
-                rust_source_files.append(project_dir / "Cargo.lock")
-        except FileNotFoundError:
+        if not src_dir.is_dir():
             print(f"❌ Errore: directory 'src' non trovata in {project_dir}")
             return None
 
+        # Uno stat per sorgente, riusato da controllo e aggiornamento cache:
+        # l'hash calcolato dal primo resta in memo per il secondo
+        rust_sources = self._iter_rs_files(src_dir)
+        rust_source_files = [path for path, _ in rust_sources]
+        stat_results = {str(path): st for path, st in rust_sources}
+        manifests = [cargo_toml_path, project_dir / "Cargo.lock"]
+        for manifest, st in zip(manifests, self._batch_stat(manifests)):
+            if st is not None:
+                rust_source_files.append(manifest)
+                stat_results[str(manifest)] = st
+
         wheel_dir = project_dir / "target" / "wheels"
-        opt_flag = "--release" if profile else ""
+        opt_flags = ["--release"] if profile else []
+        signature = self._build_signature(self.system, "pyo3", self.python_interpreter, *opt_flags)
+        cache_key = self._cache_key(rust_source_files, f"{project_dir.name}.pyo3")
+        if self._is_cached(rust_source_files, project_dir.name, cache_key, stat_results, signature):
+            module_path = Path(self.cache_index[cache_key]["exe_path"])
+            if self.verbose:
+                print(f"⚡ Modulo PyO3 [cache]: {module_path.name}")
+            return module_path
 
         print(f"[PyO3/Maturin] Compilazione progetto in: {project_dir.name}")
         
-        build_cmd = (f'"{self.python_interpreter}" -m maturin build {opt_flag} '
-                     f'--out "{wheel_dir}"')
+        build_cmd = [self.python_interpreter, "-m", "maturin", "build", *opt_flags,
+                     "--out", str(wheel_dir)]
 
-        ret_code, stdout, stderr = self._run_command(build_cmd, cwd=project_dir)
+        run = self._run_command_streaming if self.verbose else self._run_command
+        ret_code, stdout, stderr = run(build_cmd, cwd=project_dir, env=self._cargo_env())
         if stdout:
             print(stdout)
         if ret_code != 0:
@@ -726,45 +1998,103 @@ class UniversalBuilder:
             return None
 
         try:
-            wheel_file = next(wheel_dir.glob("*.whl"))
-            if self.verbose:
-                print(f"🔩 Estraggo il modulo da: {wheel_file.name}")
+            # Con più wheel (build per ABI diverse) vale la più recente
+            wheels = [(p.stat().st_mtime_ns, p) for p in wheel_dir.glob("*.whl")]
+            wheel_mtime, wheel_file = max(wheels, default=(0, None))
+            if wheel_file is None:
+                raise StopIteration
             
+            import zipfile  # solo qui: non pesa sull'import del modulo e dei worker
             with zipfile.ZipFile(wheel_file, 'r') as zf:
-                module_filename = next(f for f in zf.namelist() if f.endswith((".pyd", ".so")))
-                
-                zf.extract(module_filename, project_dir)
+                # Prima il modulo con l'EXT_SUFFIX dell'interprete configurato
+                names = [f for f in zf.namelist() if f.endswith((".pyd", ".so"))]
+                ext_suffix = self._get_ext_suffix()
+                module_filename = next((f for f in names if f.endswith(ext_suffix)), None) or names[0]
                 final_module_path = project_dir / module_filename
+
+                try:
+                    fresh = final_module_path.stat().st_mtime_ns >= wheel_mtime
+                except OSError:
+                    fresh = False
+                if not fresh:
+                    if self.verbose:
+                        print(f"🔩 Estraggo il modulo da: {wheel_file.name}")
+                    # File temporaneo + os.replace: un modulo già importato
+                    # (mappato in memoria) non viene sovrascritto sul posto
+                    final_module_path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_path = final_module_path.with_name(f".{final_module_path.name}.tmp")
+                    with zf.open(module_filename) as src, open(tmp_path, "wb") as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+                    os.replace(tmp_path, final_module_path)
                 
                 print(f"✅ Compilazione PyO3 riuscita: {final_module_path.name}")
                 print(f"   Puoi importarlo (il nome dipende dal tuo Cargo.toml)")
                 
-                self._update_cache(rust_source_files, final_module_path)
+                self._update_cache(rust_source_files, final_module_path, cache_key,
+                                   stat_results, signature)
                 return final_module_path
 
-        except StopIteration:
+        except (StopIteration, IndexError):
             print("❌ Errore: Impossibile trovare la wheel o il modulo .pyd/.so compilato.")
             return None
         except Exception as e:
             print(f"❌ Errore durante l'estrazione della wheel: {e}")
             return None
 
+    def _cargo_env(self) -> Optional[Dict[str, str]]:
+        """
+        Ambiente per cargo/maturin: CARGO_BUILD_JOBS pari ai job assegnati e,
+        con sccache disponibile, RUSTC_WRAPPER, così anche i crate dei progetti
+        Cargo finiscono nella sua cache. Le variabili già impostate dall'utente
+        restano; None se non c'è nulla da aggiungere (ambiente ereditato).
+        """
+        extra = {}
+        if self.rust_launcher and not os.environ.get("RUSTC_WRAPPER"):
+            extra["RUSTC_WRAPPER"] = self.rust_launcher[0]
+        if not os.environ.get("CARGO_BUILD_JOBS"):
+            extra["CARGO_BUILD_JOBS"] = str(self.build_jobs)
+        return {**os.environ, **extra} if extra else None
+
+    @staticmethod
+    def _iter_rs_files(root: Path) -> List[Tuple[Path, os.stat_result]]:
+        """
+        File .rs sotto root, con il loro stat, visitati con una pila di os.scandir
+        (come _get_dir_size): il tipo delle voci arriva già da readdir e lo stat
+        va diretto alla cache, senza un secondo giro di syscall.
+        """
+        found = []
+        stack = [os.fspath(root)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith(".rs") and entry.is_file():
+                            found.append((Path(entry.path), entry.stat()))
+            except OSError:
+                continue
+        return found
+
     # ===== METODI DI COMPILAZIONE JAVA (REFACTOR PARZIALE) =====
 
     def build_and_run_java(self, src_files: Union[str, List[str]], profile: bool = False) -> bool:
         """Compila ed esegue uno o più file sorgente Java (come ESEGUIBILE)."""
         if isinstance(src_files, str):
             src_files = [src_files]
-        src_paths = [Path(f).resolve() for f in src_files]
-        for src_path in src_paths:
-            if not src_path.exists():
-                print(f"❌ File sorgente non trovato: {src_path}")
-                return False
+        sources = self._stat_sources(src_files)
+        if sources is None:
+            return False
+        src_paths = sources[0]
 
         main_file = src_paths[0]
         classname = main_file.stem 
         build_cwd = main_file.parent
 
+        if self._java_batch is not None:
+            self._java_batch.append(("run", src_paths, build_cwd, classname))
+            return True
+
         file_names = ", ".join([p.name for p in src_paths])
         print(f"[Java] Compilazione: {file_names}")
 
@@ -774,13 +2104,21 @@ class UniversalBuilder:
         print("✅ Compilazione riuscita. Esecuzione...")
 
         # 2. Esegui (usa il nuovo helper _execute_and_print)
-        run_cmd = f"java {classname}"
+        run_cmd = ["java", classname]
         return self._execute_and_print(run_cmd, cwd=build_cwd)
 
     def _compile_java_files(self, src_paths: List[Path], cwd: Path) -> bool:
         """Compila i file Java (metodo helper)."""
-        src_files = " ".join([f'"{p.name}"' for p in src_paths])
-        ret_code, _, stderr = self._run_command(f"javac {src_files}", cwd=cwd)
+        result = self._run_javac_daemon(src_paths, cwd) if self.javac_daemon else None
+        if result is not None:
+            ret_code, stderr = result
+        else:
+            src_files = [p.name for p in src_paths]
+            # In parallelo la JVM di javac vede solo i core assegnati (thread GC/JIT)
+            jvm_flags = ([f"-J-XX:ActiveProcessorCount={self.build_jobs}"]
+                         if self.build_jobs < (self._cpu_count or 1) else [])
+            with self._argfile(src_files, cwd) as args:
+                ret_code, _, stderr = self._run_command(["javac", *jvm_flags, *args], cwd=cwd)
         if ret_code != 0:
             print(f"❌ Compilazione fallita.")
             if stderr:
@@ -788,6 +2126,91 @@ class UniversalBuilder:
             return False
         return True
 
+    def _get_javac_daemon(self) -> Optional[subprocess.Popen]:
+        """
+        Avvia (una volta) la JVM del demone javac. La classe si compila con
+        javac una sola volta nella directory cache. None se non disponibile.
+        """
+        if self._javac_proc is not None and self._javac_proc.poll() is None:
+            return self._javac_proc
+        self._javac_proc = None
+        if not self.cache_enabled or os.name != "posix":
+            return None
+        daemon_dir = self.cache_dir.resolve() / "javac_daemon"
+        if not (daemon_dir / f"{_JAVAC_DAEMON_CLASS}.class").exists():
+            daemon_dir.mkdir(exist_ok=True)
+            source = daemon_dir / f"{_JAVAC_DAEMON_CLASS}.java"
+            source.write_text(_JAVAC_DAEMON_SOURCE, encoding="utf-8")
+            self._dir_size_cache = None
+            ret_code, _, stderr = self._run_command(["javac", source.name], cwd=daemon_dir)
+            if ret_code != 0:
+                if self.verbose:
+                    print(f"⚠️  Demone javac non compilabile, uso javac: {stderr.strip()}")
+                return None
+        try:
+            self._javac_proc = subprocess.Popen(
+                ["java", "-cp", str(daemon_dir), _JAVAC_DAEMON_CLASS],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError:
+            return None
+        self._register_close()
+        return self._javac_proc
+
+    def _run_javac_daemon(self, src_paths: List[Path], cwd: Path) -> Optional[Tuple[int, str]]:
+        """
+        Compila con il demone javac: niente avvio della JVM né caricamento di
+        javac a ogni build, e il JIT resta caldo tra una build e l'altra.
+        Percorsi assoluti e classpath esplicito al posto della cwd di javac.
+        Restituisce (codice di uscita, diagnostica) o None per ripiegare su javac.
+        """
+        args = ["-classpath", os.environ.get("CLASSPATH", str(cwd)), *map(str, src_paths)]
+        if any("\n" in arg or not arg for arg in args):
+            return None
+        daemon = self._get_javac_daemon()
+        if daemon is None:
+            return None
+        try:
+            daemon.stdin.write(("\n".join(args) + "\n\n").encode("utf-8"))
+            daemon.stdin.flush()
+            ready, _, _ = select.select([daemon.stdout], [], [], 300)
+            if not ready:
+                daemon.kill()
+                self._javac_proc = None
+                return 1, "Timeout: il comando ha impiegato più di 5 minuti."
+            ret_code, size = map(int, daemon.stdout.readline().split())
+            message = daemon.stdout.read(size)
+        except (OSError, ValueError):
+            # Demone terminato (es. JVM incompatibile con la classe): da qui in poi javac
+            if self.verbose:
+                print("⚠️  Demone javac terminato, uso javac")
+            self._javac_proc = None
+            self.javac_daemon = False
+            return None
+        return ret_code, self._decode_output(message)
+
+    # Oltre questo numero di file gli argomenti di javac/jar passano da un @argfile
+    _ARGFILE_MIN_ARGS = 50
+
+    @classmethod
+    @contextlib.contextmanager
+    def _argfile(cls, args: List[str], cwd: Path):
+        """
+        Restituisce gli argomenti da passare a javac/jar: pochi restano in argv,
+        molti finiscono in un file di risposta temporaneo (@file, uno per riga)
+        così la riga di comando non supera i limiti di Windows (32K) o ARG_MAX.
+        """
+        if len(args) <= cls._ARGFILE_MIN_ARGS:
+            yield args
+            return
+        fd, argfile = tempfile.mkstemp(prefix=".args-", suffix=".txt", dir=cwd)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                # Tra virgolette (nomi con spazi); "\" è il carattere di escape
+                f.write("".join('"' + a.replace("\\", "\\\\") + '"\n' for a in args))
+            yield [f"@{os.path.basename(argfile)}"]
+        finally:
+            os.unlink(argfile)
+
     # ===== NUOVO: METODO COMPILAZIONE JAVA JAR (NO REFACTOR) =====
 
     def build_java_jar(self, src_files: Union[str, List[str]], 
@@ -799,11 +2222,10 @@ class UniversalBuilder:
         """
         if isinstance(src_files, str):
             src_files = [src_files]
-        src_paths = [Path(f).resolve() for f in src_files]
-        for src_path in src_paths:
-            if not src_path.exists():
-                print(f"❌ File sorgente non trovato: {src_path}")
-                return None
+        sources = self._stat_sources(src_files)
+        if sources is None:
+            return None
+        src_paths, stat_results = sources
 
         main_file = src_paths[0]
         
@@ -813,11 +2235,16 @@ class UniversalBuilder:
         jar_path = main_file.parent / jar_name
         build_cwd = main_file.parent
 
-        if self._is_cached(src_paths, jar_name):
+        cache_key = self._cache_key(src_paths, jar_name)
+        if self._is_cached(src_paths, jar_name, cache_key, stat_results):
             if self.verbose:
                 print(f"⚡ Libreria JAR [cache]: {jar_path.name}")
             return jar_path
 
+        if self._java_batch is not None:
+            self._java_batch.append(("jar", src_paths, build_cwd, jar_name, cache_key))
+            return jar_path
+
         file_names = ", ".join([p.name for p in src_paths])
         print(f"[Java JAR] Compilazione: {file_names}")
 
@@ -826,19 +2253,30 @@ class UniversalBuilder:
             return None # Compilazione fallita
 
         # 2. Trova tutti i file .class generati
-        class_files = list(build_cwd.glob("*.class"))
+        class_names = self._list_class_files(build_cwd)
+        jar_path = self._package_jar(src_paths, build_cwd, jar_name, cache_key, class_names)
+        if jar_path is None:
+            return None
         
-        if not class_files:
+        if self.verbose:
+            print("   Pulizia file .class...")
+        self._unlink_names(build_cwd, class_names)
+            
+        return jar_path
+
+    def _package_jar(self, src_paths: List[Path], build_cwd: Path, jar_name: str,
+                     cache_key: str, class_names: List[str]) -> Optional[Path]:
+        """Impacchetta i .class già compilati nel jar e aggiorna la cache (metodo helper)."""
+        jar_path = build_cwd / jar_name
+        if not class_names:
             print("❌ Errore: Nessun file .class trovato dopo la compilazione.")
             return None
 
-        class_names = " ".join([f'"{f.name}"' for f in class_files])
-        
         # 3. Costruisci il comando 'jar'
-        jar_cmd = f"jar cf {jar_name} {class_names}"
-        
         print(f"[Java JAR] Creazione archivio: {jar_name}")
-        ret_code, stdout, stderr = self._run_command(jar_cmd, cwd=build_cwd)
+        with self._argfile(class_names, build_cwd) as args:
+            jar_cmd = ["jar", "cf", jar_name, *args]
+            ret_code, stdout, stderr = self._run_command(jar_cmd, cwd=build_cwd)
 
         if stdout:
             print(stdout)
@@ -851,49 +2289,148 @@ class UniversalBuilder:
         print(f"✅ Creazione JAR riuscita: {jar_path.name}")
         print(f"   Puoi usarlo in Python con JPype (es. jpype.add_to_classpath(...))")
         
-        self._update_cache(src_paths, jar_path)
-        
-        if self.verbose:
-            print("   Pulizia file .class...")
-        for f in class_files:
-            f.unlink()
-            
+        self._update_cache(src_paths, jar_path, cache_key)
         return jar_path
 
-    # ===== METODI DI COMPILAZIONE RUST (ESEGUIBILE) (REFACTOR) =====
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Raggruppa le build Java: dentro il blocco build_java_jar e
+        build_and_run_java vengono solo accodate (restituiscono subito il jar
+        previsto / True) e all'uscita parte un solo javac per directory, cioè
+        una sola JVM, seguito in ordine da creazione dei jar ed esecuzioni.
+        Il valore del with è la lista dei risultati delle build accodate
+        (i jar già in cache non si accodano), riempita all'uscita. Come in
+        build_java_jar, un jar contiene tutte le classi compilate nella sua directory.
+        """
+        if self._java_batch is not None:
+            # Batch annidato: le build finiscono in quello esterno
+            yield []
+            return
+        self._java_batch = []
+        results = []
+        try:
+            yield results
+            pending = self._java_batch
+        finally:
+            self._java_batch = None
+        results.extend(self._flush_java_batch(pending))
+
+    def _flush_java_batch(self, pending: List[Tuple]) -> List[Union[bool, Optional[Path]]]:
+        """Esegue le build Java accodate da batch(): un javac per directory, poi jar ed esecuzioni."""
+        sources_by_cwd: Dict[Path, Dict[Path, None]] = {}
+        for _, src_paths, build_cwd, *_rest in pending:
+            sources_by_cwd.setdefault(build_cwd, {}).update(dict.fromkeys(src_paths))
+
+        compiled = {}
+        for build_cwd, sources in sources_by_cwd.items():
+            print(f"[Java] Compilazione batch in {build_cwd}: {len(sources)} file")
+            compiled[build_cwd] = self._compile_java_files(list(sources), cwd=build_cwd)
+
+        results = []
+        packed_classes: Dict[Path, List[str]] = {}
+        for kind, src_paths, build_cwd, *rest in pending:
+            if not compiled[build_cwd]:
+                results.append(False if kind == "run" else None)
+            elif kind == "run":
+                results.append(self._execute_and_print(["java", rest[0]], cwd=build_cwd))
+            else:
+                jar_name, cache_key = rest
+                # Come build_java_jar: tutte le classi emesse nella directory,
+                # non solo quelle col nome di un sorgente (classi top-level
+                # aggiuntive, interne Nome$...). Elencate una volta per directory
+                if build_cwd not in packed_classes:
+                    packed_classes[build_cwd] = self._list_class_files(build_cwd)
+                results.append(self._package_jar(src_paths, build_cwd, jar_name,
+                                                 cache_key, packed_classes[build_cwd]))
+
+        # Come build_java_jar: i .class finiti in un jar si puliscono (alla fine,
+        # perché le esecuzioni del batch possono ancora servirsene)
+        for build_cwd, class_names in packed_classes.items():
+            self._unlink_names(build_cwd, class_names)
+        return results
+
+    @staticmethod
+    def _unlink_names(directory: Path, names: List[str]):
+        """
+        Cancella da directory i file indicati per nome. Su POSIX gli unlink sono
+        relativi a un fd della directory: il percorso non si risolve a ogni file.
+        """
+        if os.unlink in os.supports_dir_fd:
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                for name in names:
+                    try:
+                        os.unlink(name, dir_fd=dir_fd)
+                    except FileNotFoundError:
+                        pass
+            finally:
+                os.close(dir_fd)
+        else:
+            base = os.fspath(directory)
+            for name in names:
+                try:
+                    os.unlink(os.path.join(base, name))
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _list_class_files(build_cwd: Path) -> List[str]:
+        """
+        Nomi dei .class nella directory: un solo os.scandir, senza la
+        macchina generica di glob né un Path per ogni voce.
+        """
+        with os.scandir(build_cwd) as entries:
+            return [entry.name for entry in entries
+                    if entry.name.endswith(".class") and entry.is_file()]
+
+        # ===== METODI DI COMPILAZIONE RUST (ESEGUIBILE) (REFACTOR) =====
 
     def build_and_run_rust(self, src_file: str, exe_name: Optional[str] = None,
                            optimization: str = "release", profile: bool = False) -> bool:
         """Compila ed esegue un file sorgente Rust (.rs) (come ESEGUIBILE)."""
-        src_path = Path(src_file).resolve()
-        if not src_path.exists():
-            print(f"❌ File sorgente non trovato: {src_path}")
+        sources = self._stat_sources([src_file])
+        if sources is None:
             return False
+        (src_path,), stat_results = sources
 
         if exe_name is None:
-            exe_name = src_path.stem + \
-                (".exe" if self.system == "Windows" else "")
+            exe_name = src_path.stem + self._exe_suffix
 
         build_cwd = src_path.parent
 
         # Definisci il generatore di comandi per rustc
         if optimization == "release":
-            opt_flags = "-C opt-level=3"
+            opt_flags = ["-C", "opt-level=3"]
+            if profile:
+                # Misurazione: sfrutta le estensioni della CPU locale (AVX2/AVX-512...)
+                opt_flags += ["-C", "target-cpu=native"]
         else:
-            opt_flags = "" # Debug (default)
+            opt_flags = [] # Debug (default)
+        # Il parallelismo del backend non entra nella firma: cambia con il
+        # numero di build concorrenti, non il programma
+        signature = self._build_signature("rustc", *opt_flags)
+        if optimization == "release":
+            # Backend LLVM sui core assegnati (una codegen unit per job)
+            opt_flags += ["-C", f"codegen-units={self.build_jobs}"]
+        if self.cache_enabled and not self.rust_launcher:
+            # Cache incrementale di rustc nella cache del builder (sccache non la supporta)
+            opt_flags += ["-C", f"incremental={self.cache_dir.resolve() / 'rustc'}"]
         
         # Usa una lambda per passare il comando di build all'orchestratore
         # Nota: src_paths[0] perché rustc qui gestisce un file alla volta
-        build_cmd_generator = lambda src_paths, name: (
-            f'rustc {opt_flags} "{src_paths[0].name}" -o "{name}"'
-        )
+        build_cmd_generator = lambda src_paths, name: [
+            *self.rust_launcher, "rustc", *opt_flags, src_paths[0].name, "-o", name
+        ]
 
         # 1. Ottieni o compila l'artefatto
         exe_path = self._get_or_build_artifact(
             [src_path], # _get_or_build_artifact si aspetta una lista
             exe_name,
             build_cmd_generator,
-            build_cwd
+            build_cwd,
+            stat_results=stat_results,
+            signature=signature
         )
 
         if exe_path is None:
@@ -901,36 +2438,34 @@ class UniversalBuilder:
 
         # 2. Esegui l'artefatto
         print(f"✅ Esecuzione di '{exe_name}'...")
-        run_cmd = f".\\{
-            exe_name}" if self.system == "Windows" else f"./{exe_name}"
-        
-        return self._execute_and_print(run_cmd, cwd=build_cwd)
+        return self._execute_and_print([str(exe_path)], cwd=exe_path.parent)
 
 
     def build_rust_project(self, project_dir: str = ".",
                            optimization: str = "release", profile: bool = False) -> bool:
         """Compila un progetto Rust con Cargo (come ESEGUIBILE)."""
-        project_path = Path(project_dir).resolve()
+        project_path = _resolve_path(project_dir)
         if not (project_path / "Cargo.toml").exists():
             print(f"❌ Cargo.toml non trovato in: {project_path}")
             return False
 
         print(f"[Cargo] Compilazione progetto in: {project_path}")
 
-        opt_flag = "--release" if optimization == "release" else ""
-        build_cmd = f"cargo build {opt_flag}"
+        opt_flags = ["--release"] if optimization == "release" else []
+        build_cmd = ["cargo", "build", *opt_flags]
 
-        ret_code, stdout, stderr = self._run_command(build_cmd, cwd=project_path)
-        if stdout:
-            print(stdout)
+        # cargo produce molto output (e warning): in verbose lo si vede mentre compila
+        run = self._run_command_streaming if self.verbose else self._run_command
+        ret_code, stdout, stderr = run(build_cmd, cwd=project_path, env=self._cargo_env())
+        parts = [stdout] if stdout else []
         if ret_code != 0:
-            print("❌ Compilazione fallita.")
+            parts.append("❌ Compilazione fallita.")
             if stderr:
-                print(f"ERRORE:\n{stderr}")
-            return False
-
-        print("✅ Compilazione riuscita!")
-        return True
+                parts.append(f"ERRORE:\n{stderr}")
+        else:
+            parts.append("✅ Compilazione riuscita!")
+        print("\n".join(parts))
+        return ret_code == 0
 
     # ===== METODI PER PYTHON (REFACTOR) =====
 
@@ -938,105 +2473,153 @@ class UniversalBuilder:
         """Esegue uno o più script Python usando il Python interpreter configurato."""
         if isinstance(py_files, str):
             py_files = [py_files]
-        py_paths = [Path(f).resolve() for f in py_files]
-        for py_path in py_paths:
-            if not py_path.exists():
-                print(f"❌ File Python non trovato: {py_path}")
-                return False
+        sources = self._stat_sources(py_files, shared_root=True)
+        if sources is None:
+            return False
+        py_paths = sources[0]
 
         main_file = py_paths[0]
         build_cwd = main_file.parent
 
         file_names = ", ".join([p.name for p in py_paths])
-        print(f"[Python] Esecuzione: {file_names}")
-        print(f"   Interpreter: {self.python_interpreter}")
+        print(f"[Python] Esecuzione: {file_names}\n   Interpreter: {self.python_interpreter}")
+
+        if self.reuse_interpreter and hasattr(os, "fork"):
+            ret_code, stdout, stderr = self._run_python_reused(main_file)
+            return self._print_execution_output(ret_code, stdout, stderr)
 
-        run_cmd = f'"{self.python_interpreter}" "{main_file.name}"'
+        cached_pyc = self._get_cached_pyc(main_file)
+        if cached_pyc is not None:
+            # Bytecode già pronto: l'interprete non riparsa lo script principale
+            run_cmd = [self.python_interpreter, "-c", _PYC_RUNNER, str(cached_pyc), str(main_file)]
+        else:
+            run_cmd = [self.python_interpreter, main_file.name]
         
         # Usa l'helper per l'esecuzione e la stampa
         return self._execute_and_print(run_cmd, cwd=build_cwd)
 
-    # ===== FUNZIONI DI UTILITÀ =====
+    def _get_cached_pyc(self, main_file: Path) -> Optional[Path]:
+        """
+        Bytecode dello script principale nella cache, indirizzato per contenuto
+        e percorso (il .pyc registra il nome del file per i traceback):
+        <digest>.<cache_tag>.pyc. Python non salva mai il .pyc di __main__.
+        None se la cache è disabilitata, se l'interprete configurato usa un
+        bytecode diverso da questo processo o se lo script non compila.
+        """
+        if not self.cache_enabled:
+            return None
+        try:
+            if self.python_interpreter == sys.executable:
+                cache_tag = sys.implementation.cache_tag
+            else:
+                cache_tag = self._python_config["cache_tag"]
+            if not cache_tag or cache_tag != sys.implementation.cache_tag:
+                return None
 
-    @staticmethod
-    def _find_vcvars64() -> str:
-        """Trova vcvars64.bat per Visual Studio."""
-        base_paths = [
-            Path("C:/Program Files/Microsoft Visual Studio"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio")
-        ]
-        versions = ["2022", "2019", "2017"]
-        editions = ["BuildTools", "Community", "Professional", "Enterprise"]
-
-        for base in base_paths:
-            for version in versions:
-                for edition in editions:
-                    candidate = base / version / edition / "VC/Auxiliary/Build/vcvars64.bat"
-                    if candidate.exists():
-                        return str(candidate)
-
-        raise FileNotFoundError(
-            "vcvars64.bat non trovato! Installa Visual Studio Build Tools o Community."
-        )
+            pyc_key = hashlib.blake2b(
+                f"{main_file}\0{self._compute_file_hash(main_file)}".encode(),
+                digest_size=16).hexdigest()
+            pyc_path = self.cache_dir.resolve() / "pyc" / f"{pyc_key}.{cache_tag}.pyc"
+            if not pyc_path.exists():
+                pyc_path.parent.mkdir(exist_ok=True)
+                py_compile.compile(str(main_file), cfile=str(pyc_path),
+                                   dfile=str(main_file), doraise=True)
+                self._dir_size_cache = None
+            return pyc_path
+        except (OSError, subprocess.CalledProcessError, py_compile.PyCompileError):
+            return None
 
-    @staticmethod
-    def check_toolchain():
-        """Controlla la disponibilità degli strumenti di compilazione."""
-        print("=== Controllo Toolchain ===")
-        tools = {}
+    def _get_py_worker(self) -> subprocess.Popen:
+        """Avvia (una volta) l'interprete persistente che esegue gli script via fork."""
+        if self._py_worker is None or self._py_worker.poll() is not None:
+            self._py_worker = subprocess.Popen(
+                [self.python_interpreter, "-u", "-c", _PY_WORKER_BOOTSTRAP],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+            self._register_close()
+        return self._py_worker
 
-        tools['Python'] = f"✅ Disponibile (Versione: {sys.version.split()[0]})"
+    def _run_python_reused(self, main_file: Path) -> Tuple[int, str, str]:
+        """
+        Esegue uno script nell'interprete persistente: il worker fa fork e il
+        figlio lo esegue con runpy, così ogni run parte da uno stato pulito ma
+        senza pagare l'avvio dell'interprete e di site.py.
+        """
+        if self.verbose:
+            print(f"▶️ Eseguo in {main_file.parent} (interprete riusato): {main_file.name}")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_file = Path(tmp_dir) / "stdout"
+            err_file = Path(tmp_dir) / "stderr"
+            request = {"script": str(main_file), "cwd": str(main_file.parent),
+                       "argv0": str(main_file), "out": str(out_file), "err": str(err_file)}
+            worker = self._get_py_worker()
+            try:
+                worker.stdin.write(json.dumps(request) + "\n")
+                worker.stdin.flush()
+                ready, _, _ = select.select([worker.stdout], [], [], 300)
+                if not ready:
+                    worker.kill()
+                    self._py_worker = None
+                    return 1, "", "Timeout: il comando ha impiegato più di 5 minuti."
+                reply = worker.stdout.readline()
+                ret_code = int(reply)
+            except (OSError, ValueError) as e:
+                self._py_worker = None
+                return 1, "", f"Errore dell'interprete riusato: {e}"
+            return (ret_code,
+                    self._decode_output(out_file.read_bytes()) if out_file.exists() else "",
+                    self._decode_output(err_file.read_bytes()) if err_file.exists() else "")
 
-        if PYBIND11_AVAILABLE:
-            tools['PyBind11'] = "✅ Disponibile"
-        else:
-            tools['PyBind11'] = "❌ Non disponibile (esegui: pip install pybind11)"
+    # ===== FUNZIONI DI UTILITÀ =====
 
-        if MATURIN_AVAILABLE:
-            tools['PyO3 (Maturin)'] = "✅ Disponibile (per build moduli Rust)"
-        else:
-            tools['PyO3 (Maturin)'] = "❌ Non disponibile (esegui: pip install maturin)"
+    @staticmethod
+    def _find_vcvars64() -> str:
+        """Trova vcvars64.bat per Visual Studio (la ricerca su disco avviene una sola volta)."""
+        return _find_vcvars64_cached()
 
-        if platform.system() == "Windows":
-            try:
-                UniversalBuilder._find_vcvars64()
-                tools['MSVC (C++)'] = "✅ Disponibile"
-            except FileNotFoundError:
-                tools['MSVC (C++)'] = "❌ Non disponibile (Installa Visual Studio Build Tools)"
-        else:
-            ret = subprocess.run("g++ --version", shell=True,
-                                 capture_output=True).returncode
-            tools['g++ (C++)'] = "✅ Disponibile" if ret == 0 else "❌ Non disponibile"
-
-        ret_javac = subprocess.run("javac -version", shell=True,
-                                   capture_output=True)
-        ret_jar = subprocess.run("jar --version", shell=True,
-                                 capture_output=True)
-        if ret_javac.returncode == 0:
-            tools['Java (javac)'] = f"✅ Disponibile"
-            if ret_jar.returncode == 0:
-                tools['Java (jar)'] = "✅ Disponibile (per build .jar)"
-            else:
-                tools['Java (jar)'] = "❌ 'jar' non trovato (JDK incompleto?)"
-        else:
-            tools['Java (JDK)'] = "❌ Non disponibile (Installa un JDK)"
+    def _get_msvc_env(self) -> Dict[str, str]:
+        """
+        Ambiente di vcvars64.bat, catturato una volta sola: i comandi 'cl' lo
+        ricevono via env= invece di rieseguire 'call vcvars64.bat &&' ad ogni build.
+        """
+        return _capture_msvc_env(self._find_vcvars64())
 
+    def _get_msvc_cl(self) -> str:
+        """
+        Percorso assoluto di cl.exe nel PATH di vcvars: senza shell, CreateProcess
+        cercherebbe l'eseguibile nel PATH del processo corrente, non in quello di env=.
+        """
+        return self._msvc_cl_path
 
-        ret = subprocess.run("rustc --version", shell=True,
-                             capture_output=True, text=True)
-        if ret.returncode == 0:
-            tools['Rust (rustc)'] = f"✅ Disponibile ({ret.stdout.strip()})"
-        else:
-            tools['Rust (rustc)'] = "❌ Non disponibile (vedi: https://rustup.rs)"
+    @functools.cached_property
+    def _msvc_cl_path(self) -> str:
+        """Ricerca di cl.exe fatta una volta per istanza (solo se riuscita)."""
+        cl_path = shutil.which("cl", path=self._get_msvc_env().get("PATH"))
+        if cl_path is None:
+            raise FileNotFoundError("cl.exe non trovato nell'ambiente di vcvars64.bat")
+        return cl_path
 
-        ret = subprocess.run("cargo --version", shell=True,
-                             capture_output=True, text=True)
-        if ret.returncode == 0:
-            tools['Cargo'] = f"✅ Disponibile ({ret.stdout.strip()})"
-        else:
-            tools['Cargo'] = "❌ Non disponibile (vedi: https://rustup.rs)"
+    @staticmethod
+    def _probe_tool(argv: List[str]) -> subprocess.CompletedProcess:
+        """
+        Esegue "<tool> --version" senza shell. Un eseguibile assente diventa
+        un returncode 127 (come farebbe la shell) invece di un'eccezione.
+        """
+        try:
+            return subprocess.run(argv, capture_output=True, text=True)
+        except OSError as e:
+            return subprocess.CompletedProcess(argv, 127, "", str(e))
 
-        for tool, status in tools.items():
+    @staticmethod
+    def check_toolchain(refresh: bool = False):
+        """
+        Controlla la disponibilità degli strumenti di compilazione.
+        I probe girano una volta per processo (vedi _probe_toolchain):
+        refresh=True li ripete, ad es. dopo aver installato un compilatore.
+        """
+        if refresh:
+            _probe_toolchain.cache_clear()
+        print("=== Controllo Toolchain ===")
+        for tool, status in _probe_toolchain():
             print(f"- {tool}: {status}")
 
     def clear_cache(self):
@@ -1045,14 +2628,29 @@ class UniversalBuilder:
             print("Cache non abilitata")
             return
         try:
-            import shutil
-            shutil.rmtree(self.cache_dir)
+            # Rinomina (istantaneo) e cancella in background: la cache vuota è
+            # subito disponibile anche se contiene migliaia di file
+            trash_dir = self.cache_dir.with_name(
+                f"{self.cache_dir.name}.gc-{uuid.uuid4().hex}")
+            self.cache_dir.rename(trash_dir)
+            # Anche i resti di pulizie interrotte dall'uscita del processo
+            leftovers = list(self.cache_dir.parent.glob(f"{self.cache_dir.name}.gc-*"))
+            threading.Thread(target=self._remove_dirs, args=(leftovers,), daemon=True).start()
             self.cache_dir.mkdir(exist_ok=True)
             self.cache_index = {}
+            self._dirty_keys = set()
+            self._journal_lines = 0
+            self._dir_size_cache = None
             print(f"✅ Cache pulita: {self.cache_dir}")
         except Exception as e:
             print(f"❌ Errore pulizia cache: {e}")
 
+    @staticmethod
+    def _remove_dirs(dirs: List[Path]):
+        """Cancella le directory indicate (thread di pulizia di clear_cache)."""
+        for directory in dirs:
+            shutil.rmtree(directory, ignore_errors=True)
+
     def get_cache_stats(self) -> Dict:
         """Ritorna statistiche sulla cache."""
         if not self.cache_enabled:
@@ -1061,17 +2659,48 @@ class UniversalBuilder:
             "enabled": True,
             "cache_dir": str(self.cache_dir),
             "num_cached_builds": len(self.cache_index),
-            "cache_size_mb": self._get_dir_size(self.cache_dir) / 1024 / 1024,
+            "cache_size_mb": self._get_cache_dir_size() / 1024 / 1024,
             "cached_files": self.cache_index
         }
 
+    def _get_cache_dir_size(self) -> float:
+        """
+        Dimensione della directory cache, ricalcolata solo se è cambiata: la
+        chiave è la mtime della directory, e ogni scrittura del builder nella
+        cache invalida il valore memorizzato (indice, store, oggetti C++,
+        bytecode, cache incrementale di rustc, demone javac), perché le
+        sottodirectory non cambiano la mtime di quella principale.
+        """
+        try:
+            dir_mtime_ns = self.cache_dir.stat().st_mtime_ns
+        except OSError:
+            return 0
+        cached = self._dir_size_cache
+        if cached is not None and cached[0] == dir_mtime_ns:
+            return cached[1]
+        size = self._get_dir_size(self.cache_dir)
+        self._dir_size_cache = (dir_mtime_ns, size)
+        return size
+
     @staticmethod
     def _get_dir_size(path: Path) -> float:
-        """Calcola la dimensione di una directory in bytes."""
+        """
+        Calcola la dimensione di una directory in bytes.
+        os.scandir iterativo: niente Path per ogni voce, e il tipo arriva già
+        dalla lettura della directory (DirEntry).
+        """
         total = 0
-        for entry in path.rglob('*'):
-            if entry.is_file():
-                total += entry.stat().st_size
+        stack = [os.fspath(path)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
         return total
 
     def get_python_info(self) -> Dict:
@@ -1083,15 +2712,151 @@ class UniversalBuilder:
         }
 
     def get_parallel_info(self) -> Dict:
-        """Ritorna informazioni sulla parallelizzazione."""
+        """Ritorna informazioni sulla parallelizzazione (cpu_count letto una volta in __init__)."""
         return {
             "parallel_enabled": self.parallel_enabled,
             "max_workers": self.max_workers,
-            "cpu_count": os.cpu_count(),
-            "executor_type": "ThreadPoolExecutor"
+            "cpu_count": self._cpu_count,
+            "executor_type": ("ProcessPoolExecutor" if self._use_process_pool()
+                              else "ThreadPoolExecutor")
         }
 
 
+@functools.lru_cache(maxsize=1)
+def _probe_toolchain() -> Tuple[Tuple[str, str], ...]:
+    """
+    Stato della toolchain come coppie (strumento, messaggio), calcolato una volta:
+    i compilatori installati non cambiano durante il processo.
+    """
+    tools = {}
+
+    # I probe sono processi indipendenti: lanciati tutti insieme, il tempo
+    # totale è quello del più lento invece della somma
+    probes = {
+        "javac": ["javac", "-version"],
+        "jar": ["jar", "--version"],
+        "rustc": ["rustc", "--version"],
+        "cargo": ["cargo", "--version"],
+    }
+    if platform.system() != "Windows":
+        probes["g++"] = ["g++", "--version"]
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        results = dict(zip(probes, executor.map(UniversalBuilder._probe_tool,
+                                                probes.values())))
+
+    tools['Python'] = f"✅ Disponibile (Versione: {sys.version.split()[0]})"
+
+    if PYBIND11_AVAILABLE:
+        tools['PyBind11'] = "✅ Disponibile"
+    else:
+        tools['PyBind11'] = "❌ Non disponibile (esegui: pip install pybind11)"
+
+    if MATURIN_AVAILABLE:
+        tools['PyO3 (Maturin)'] = "✅ Disponibile (per build moduli Rust)"
+    else:
+        tools['PyO3 (Maturin)'] = "❌ Non disponibile (esegui: pip install maturin)"
+
+    if platform.system() == "Windows":
+        try:
+            UniversalBuilder._find_vcvars64()
+            tools['MSVC (C++)'] = "✅ Disponibile"
+        except FileNotFoundError:
+            tools['MSVC (C++)'] = "❌ Non disponibile (Installa Visual Studio Build Tools)"
+    else:
+        ret = results["g++"]
+        tools['g++ (C++)'] = "✅ Disponibile" if ret.returncode == 0 else "❌ Non disponibile"
+
+    ret_javac = results["javac"]
+    ret_jar = results["jar"]
+    if ret_javac.returncode == 0:
+        tools['Java (javac)'] = f"✅ Disponibile"
+        if ret_jar.returncode == 0:
+            tools['Java (jar)'] = "✅ Disponibile (per build .jar)"
+        else:
+            tools['Java (jar)'] = "❌ 'jar' non trovato (JDK incompleto?)"
+    else:
+        tools['Java (JDK)'] = "❌ Non disponibile (Installa un JDK)"
+
+
+    ret = results["rustc"]
+    if ret.returncode == 0:
+        tools['Rust (rustc)'] = f"✅ Disponibile ({ret.stdout.strip()})"
+    else:
+        tools['Rust (rustc)'] = "❌ Non disponibile (vedi: https://rustup.rs)"
+
+    ret = results["cargo"]
+    if ret.returncode == 0:
+        tools['Cargo'] = f"✅ Disponibile ({ret.stdout.strip()})"
+    else:
+        tools['Cargo'] = "❌ Non disponibile (vedi: https://rustup.rs)"
+
+    return tuple(tools.items())
+
+
+# Builder leggero del worker (uno per thread/processo), riusato tra i task
+_worker_state = threading.local()
+
+
+def _get_worker_builder(config: Dict) -> UniversalBuilder:
+    """
+    Restituisce il builder del worker, ricreandolo solo se la configurazione è
+    cambiata. Riusarlo tiene calda la memo degli hash tra una build e l'altra;
+    l'indice cache invece si rilegge, perché il processo principale può averlo aggiornato.
+    """
+    cached = getattr(_worker_state, "entry", None)
+    if cached is None or cached[0] != config:
+        _worker_state.entry = (config, UniversalBuilder._from_worker_config(config))
+        return _worker_state.entry[1]
+    builder = cached[1]
+    if builder.cache_enabled:
+        builder._load_cache_index()
+    return builder
+
+
+def _init_worker(config: Dict):
+    """Initializer del pool: import del modulo e builder pronti prima del primo task."""
+    _get_worker_builder(config)
+
+
+def _run_captured(fn: Callable, *args) -> Tuple[object, str]:
+    """
+    Esegue un task del pool e ne restituisce (risultato, output stampato).
+    Nei processi worker le stampe finiscono in un buffer che il processo
+    principale scrive in blocco al completamento: niente righe di task diversi
+    mescolate. Con i thread (Windows) sys.stdout è condiviso e l'output resta live.
+    """
+    if multiprocessing.parent_process() is None:
+        return fn(*args), ""
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            result = fn(*args)
+    except BaseException:
+        # Il task fallisce: il suo output non va perso
+        sys.stdout.write(buffer.getvalue())
+        raise
+    return result, buffer.getvalue()
+
+
+def _build_and_run_worker(lang: str, files: List[Path], profile: bool,
+                          config: Dict) -> Tuple[bool, str]:
+    """
+    Entry point dei worker di _build_and_run_mixed_parallel.
+    Sta a livello di modulo per essere picklable (submit serializza il task).
+    """
+    builder = _get_worker_builder(config)
+    try:
+        return _run_captured(builder._build_and_run_language, lang, files, profile)
+    finally:
+        builder._flush_cache_index()
+
+
+def _run_command_worker(cmd: List[str], cwd: Path, env: Optional[Dict[str, str]],
+                        config: Dict) -> Tuple[Tuple[int, str, str], str]:
+    """Entry point dei task fini (un comando di compilazione) di _build_and_run_mixed_parallel."""
+    return _run_captured(_get_worker_builder(config)._run_command, cmd, cwd, env)
+
+
 # --- Esempi d'uso ---
 if __name__ == '__main__':
     print("╔════════════════════════════════════════════════════════════╗")